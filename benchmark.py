@@ -0,0 +1,471 @@
+import os
+import csv
+import json
+import time
+import atexit
+import argparse
+import tempfile
+
+import networkx as nx
+import numpy as np
+
+from utils.csr import CSRTree
+from utils.dataset import Generator
+from utils.loader import DatasetLoader
+from utils.profiler import Profiler
+
+from vertex_cover.bounds import BOUNDS
+from vertex_cover.vc_bnb import BranchAndBound
+from vertex_cover.vc_dp import DynamicProgramming
+from vertex_cover.vc_dynamic import DynamicTreeDP
+from vertex_cover.vc_external import ExternalDP
+from vertex_cover.subtree_memo import SubtreeMemo
+from vertex_cover.vc_ls import LocalSearch
+from vertex_cover.vc_td import TreeDecompositionDP
+
+
+FIELDS = [
+    'solver', 'family', 'size', 'seed', 'nodes', 'result', 'repeats',
+    'median_ms', 'p95_ms', 'min_ms', 'peak_mb', 'rss_peak_mb', 'nodes_per_s', 'phases_ms', 'error'
+]
+
+
+def bnb_subgraph(tree: CSRTree, K: int) -> nx.Graph:
+    '''
+    subgraph induced by vertices 1..K, as solved by the driver
+    '''
+    G = nx.Graph()
+    G.add_nodes_from(range(1, K + 1))
+    G.add_edges_from(tree.subgraph_edges(K).tolist())
+    return G
+
+
+def memo_fields(memo: SubtreeMemo) -> dict:
+    '''
+    record fields of a subtree memo after a solve
+    '''
+    return {'memo_hits': memo.hits, 'memo_misses': memo.misses(), 'memo_hit_rate': memo.hit_rate(),
+            'shapes': len(memo.entries)}
+
+
+def dp_solver(mode: str, weighted: bool = False, forced: bool = False):
+    '''
+    returns (prepare, run) pair for a DP mode, weighted draws random integer vertex weights,
+    forced also computes the forced in / out cover sizes of all vertices (solve_forced),
+    mode 'memoized' runs solve_memoized with a fresh SubtreeMemo
+    '''
+    def prepare(tree: CSRTree, args, seed: int):
+        weights = Generator().random_weights(tree.N, seed) if weighted else None
+        # every run starts from bare CSR arrays
+        return CSRTree(tree.offsets, tree.neighbors, tree.N, tree.root), tree.N, weights
+
+    def run(case, profiler=None):
+        '''
+        returns (result, extra fields for the record)
+        '''
+        fresh, N, weights = case
+        fresh.parent = fresh.order = fresh.levels = None
+        if mode == 'memoized':
+            memo = SubtreeMemo()
+            vc = DynamicProgramming().solve_memoized(fresh, memo, profiler)
+            return vc, memo_fields(memo)
+
+        if forced:
+            dp = DynamicProgramming()
+            dp.solve_forced(fresh, N, mode, profiler, weights)
+            return min(dp.forced_size(fresh.root, 0), dp.forced_size(fresh.root, 1)), {}
+
+        vc, _ = DynamicProgramming().solve(fresh, N, mode, profiler, weights)
+        return vc, {}
+
+    return prepare, run
+
+
+def td_solver(heuristic: str):
+    '''
+    returns (prepare, run) pair for the tree decomposition DP with an elimination heuristic
+    '''
+    def prepare(tree: CSRTree, args, seed: int):
+        adj = tree.adjacency()
+        return {v: adj[v] for v in range(1, tree.N + 1)}, tree.N
+
+    def run(case, profiler=None):
+        G, N = case
+        td = TreeDecompositionDP()
+        vc, _ = td.solve(G, heuristic, profiler)
+        return vc, {'width': td.width, 'table_mb': td.table_bytes / (1024 ** 2)}   # bytes to MB
+
+    return prepare, run
+
+
+def batch_solver(batched: bool, memoized: bool = False):
+    '''
+    returns (prepare, run) pair for a forest of small random trees with as many vertices
+    as the case tree, solved in one solve_batch call (solve_batch_memoized with a fresh
+    SubtreeMemo if memoized) or tree by tree with solve
+    '''
+    def prepare(tree: CSRTree, args, seed: int):
+        size = args.batch_tree_size
+        return Generator().random_forest(tree.N // size, size, seed), tree.N // size * size, size
+
+    def run(case, profiler=None):
+        parent, N, size = case
+        trees = N // size
+
+        if memoized:
+            memo = SubtreeMemo()
+            sizes = DynamicProgramming().solve_batch_memoized(parent, memo, profiler)
+            return int(np.sum(sizes)), {'trees': trees, **memo_fields(memo)}
+
+        if batched:
+            sizes = DynamicProgramming().solve_batch(parent, profiler)
+        else:
+            # what callers had to do before: one CSR tree and one solve per tree
+            sizes = []
+            for t in range(trees):
+                local = np.zeros(size + 1, dtype=np.int32)
+                local[2:] = parent[t * size + 1:(t + 1) * size] - t * size + 1
+                sizes.append(DynamicProgramming().solve(CSRTree.from_parent(local, 1), size, 'iterative', profiler)[0])
+
+        return int(np.sum(sizes)), {'trees': trees}
+
+    return prepare, run
+
+
+def dynamic_solver(incremental: bool):
+    '''
+    returns (prepare, run) pair for tree updates: random leaf insertions and deletions and
+    subtree cuts and links on a DynamicTreeDP, or a full solve of the updated tree per update
+    (the rebuild baseline, one leaf insertion per run)
+    '''
+    def prepare(tree: CSRTree, args, seed: int):
+        rng = np.random.default_rng(seed)
+        tree.ensure_bfs()
+
+        if not incremental:
+            return tree.parent, tree.N, int(rng.integers(1, tree.N + 1))
+
+        dynamic = DynamicTreeDP()
+        dynamic.build(tree)
+        # every leaf is removed and every cut linked back, so all runs see the same tree
+        targets = rng.integers(1, tree.N + 1, size=(args.updates // 4, 2)).tolist()
+        return dynamic, tree.N, targets
+
+    def run(case, profiler=None):
+        if not incremental:
+            parent, N, p = case
+            updated = np.append(parent, np.int32(p))
+            vc = DynamicProgramming().solve(CSRTree.from_parent(updated), N + 1, 'iterative', profiler)[0]
+            return vc, {'updates': 1}
+
+        dynamic, N, targets = case
+        updates = touched = 0
+        for p, v in targets:
+            leaf = dynamic.add_leaf(p)
+            touched += dynamic.touched
+            dynamic.remove_leaf(leaf)
+            touched += dynamic.touched
+            updates += 2
+
+            p = dynamic.parent[v]
+            if p:
+                dynamic.cut(v)
+                touched += dynamic.touched
+                dynamic.link(v, p)
+                touched += dynamic.touched
+                updates += 2
+
+        return dynamic.size(), {'updates': updates, 'touched_per_update': touched / max(updates, 1)}
+
+    return prepare, run
+
+
+def external_solver():
+    '''
+    returns (prepare, run) pair for the out-of-core DP, the tree is written once as a
+    depth-sorted record file in the temp directory (removed at exit)
+    '''
+    def prepare(tree: CSRTree, args, seed: int):
+        fd, path = tempfile.mkstemp(suffix='.dep')
+        os.close(fd)
+        atexit.register(os.remove, path)
+
+        DatasetLoader().write_depth_sorted(tree, path)
+        return path, tree.N, args.external_budget_mb
+
+    def run(case, profiler=None):
+        path, N, budget = case
+        external = ExternalDP(budget)
+        vc, _ = external.solve(path, profiler)
+        return vc, {'mb_per_s': external.mb_per_s, 'chunks': external.chunks}
+
+    return prepare, run
+
+
+def bnb_solver(weighted: bool = False, **options):
+    '''
+    returns (prepare, run) pair for branch and bound on the first K vertices,
+    options are passed to BranchAndBound, weighted draws random integer vertex weights
+    '''
+    def prepare(tree: CSRTree, args, seed: int):
+        K = min(tree.N, args.bnb_nodes)
+        weights = Generator().random_weights(K, seed).tolist() if weighted else None
+        return bnb_subgraph(tree, K), args.bnb_cutoff, weights
+
+    def run(case, profiler=None):
+        G, cutoff, weights = case
+        bnb = BranchAndBound(**options)
+        vc, times, _, _, stats = bnb.solve(G, cutoff, profiler, weights=weights)
+        return bnb.vc_size(vc, weights), {
+            'nodes_explored': stats.nodes,
+            'prunes': stats.prunes,
+            'max_depth': stats.max_depth,
+            'cache_hit_rate': stats.cache_hit_rate(),
+            'bound_ms': stats.bound_time * 1000,   # to ms
+            'first_ms': times[0][1] * 1000,   # first cover found, to ms
+        }
+
+    return prepare, run
+
+
+def ls_solver():
+    '''
+    returns (prepare, run) pair for local search on the whole tree, a fixed number of
+    steps per run so results do not depend on the machine (the budget only caps the time)
+    '''
+    def prepare(tree: CSRTree, args, seed: int):
+        return tree, tree.N, args.ls_budget, args.ls_steps, seed
+
+    def run(case, profiler=None):
+        tree, N, budget, steps, seed = case
+        ls = LocalSearch(seed, max_steps=steps)
+        vc, times, _, _ = ls.solve(tree, budget, profiler)
+        return len(vc), {
+            'steps': ls.steps,
+            'initial_size': ls.initial_size,
+            'lower_bound': ls.lower_bound,
+            'first_ms': times[0][1] * 1000,   # initial cover, to ms
+            'best_ms': times[-1][1] * 1000,   # best cover found, to ms
+        }
+
+    return prepare, run
+
+
+SOLVERS = {
+    'dp-iterative': dp_solver('iterative'),
+    'dp-vectorized': dp_solver('vectorized'),
+    'dp-recursive': dp_solver('recursive'),
+    'dp-weighted': dp_solver('iterative', weighted=True),
+    'dp-forced': dp_solver('iterative', forced=True),
+    'dp-forced-vectorized': dp_solver('vectorized', forced=True),
+    'dp-batch': batch_solver(batched=True),
+    'dp-per-tree': batch_solver(batched=False),
+    'dp-memoized': dp_solver('memoized'),
+    'dp-batch-memoized': batch_solver(batched=True, memoized=True),
+    'dp-external': external_solver(),
+    'dp-dynamic': dynamic_solver(incremental=True),
+    'dp-rebuild': dynamic_solver(incremental=False),
+    'td-min-degree': td_solver('min_degree'),
+    'td-min-fill': td_solver('min_fill'),
+    'ls': ls_solver(),
+    'bnb': bnb_solver(),
+    'bnb-noreduce': bnb_solver(reduce=False),
+    'bnb-nowarm': bnb_solver(reduce=False, warm_start=False),
+    'bnb-cache': bnb_solver(reduce=False, warm_start=False, cache_size=1 << 16),
+    'bnb-nodecompose': bnb_solver(reduce=False, decompose=False),
+    'bnb-parallel': bnb_solver(reduce=False, workers=os.cpu_count() or 1),
+    'bnb-weighted': bnb_solver(weighted=True, bound='packing'),
+}
+
+# lower bound strategies, on the unreduced graph so the search actually branches
+for bound in BOUNDS:
+    SOLVERS[f'bnb-bound-{bound}'] = bnb_solver(reduce=False, bound=bound)
+
+# search-tree parallel BnB, scaling is reported as speedup against bnb-split-1
+for workers in (1, 2, 4, 8):
+    SOLVERS[f'bnb-split-{workers}'] = bnb_solver(reduce=False, decompose=False, workers=workers, split_depth=4)
+
+
+def solved_nodes(solver: str, case) -> int:
+    return case[0].number_of_nodes() if solver.startswith('bnb') else case[1]
+
+
+def run_case(solver: str, family: str, size: int, seed: int, args) -> dict:
+    '''
+    warms up, then times `repeats` runs of one solver on one generated tree
+    '''
+    record = {'solver': solver, 'family': family, 'size': size, 'seed': seed, 'error': ''}
+
+    tree = Generator().generate_tree(size, family, seed)
+    prepare, run = SOLVERS[solver]
+    case = prepare(tree, args, seed)
+    record['nodes'] = solved_nodes(solver, case)
+
+    try:
+        for _ in range(args.warmup):
+            run(case)
+
+        samples = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            result, extra = run(case)
+            samples.append((time.perf_counter() - start) * 1000)  # to ms
+
+        # separate run for memory, tracing slows python code down
+        with Profiler(trace_python=True) as profiler:
+            run(case, profiler)
+        memory = profiler.report()
+
+    except (RecursionError, ValueError) as e:
+        record['error'] = f'{type(e).__name__}: {e}'
+        return record
+
+    median = float(np.median(samples))
+
+    record.update(extra)
+    record.update({
+        'result': result,
+        'repeats': args.repeats,
+        'median_ms': median,
+        'p95_ms': float(np.percentile(samples, 95)),
+        'min_ms': float(min(samples)),
+        'peak_mb': memory['traced_peak_mb'],
+        'rss_peak_mb': memory['rss_peak_mb'],
+        'phases_ms': memory['phases_ms'],
+        'nodes_per_s': record['nodes'] / (median / 1000) if median > 0 else float('inf'),
+    })
+    if 'updates' in record:
+        record['update_us'] = median * 1000 / record['updates']   # ms to us
+    if 'trees' in record:
+        record['trees_per_s'] = record['trees'] / (median / 1000) if median > 0 else float('inf')
+    return record
+
+
+def add_speedup(records: list[dict]) -> None:
+    '''
+    speedup of bnb-split-<workers> against bnb-split-1 on the same case
+    '''
+    key = lambda r: (r['family'], r['size'], r['seed'])
+    single = {key(r): r for r in records if r['solver'] == 'bnb-split-1' and not r['error']}
+
+    for r in records:
+        base = single.get(key(r))
+        if r['solver'].startswith('bnb-split-') and base is not None and not r['error']:
+            r['workers'] = int(r['solver'].rsplit('-', 1)[1])
+            r['speedup'] = base['median_ms'] / r['median_ms'] if r['median_ms'] > 0 else float('inf')
+
+
+def compare(records: list[dict], baseline: list[dict], threshold: float) -> list[str]:
+    '''
+    flags cases whose median time grew by more than threshold (fraction)
+    '''
+    key = lambda r: (r['solver'], r['family'], r['size'], r['seed'])
+    previous = {key(r): r for r in baseline if not r.get('error')}
+
+    regressions = []
+    for r in records:
+        old = previous.get(key(r))
+        if old is None or r.get('error'):
+            continue
+
+        ratio = r['median_ms'] / old['median_ms'] if old['median_ms'] > 0 else 1.0
+        r['baseline_median_ms'] = old['median_ms']
+        r['ratio'] = ratio
+
+        if ratio > 1 + threshold:
+            regressions.append(
+                f'[Benchmark] REGRESSION {r["solver"]} {r["family"]} n={r["size"]} seed={r["seed"]}: '
+                f'{old["median_ms"]:.2f} ms -> {r["median_ms"]:.2f} ms ({ratio:.2f}x)'
+            )
+
+    return regressions
+
+
+def export(records: list[dict], prefix: str, formats: list[str]) -> None:
+    if 'json' in formats:
+        with open(f'{prefix}.json', 'w') as f:
+            json.dump(records, f, indent=2)
+
+    if 'csv' in formats:
+        fields = FIELDS + sorted({k for r in records for k in r} - set(FIELDS))
+        with open(f'{prefix}.csv', 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(records)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Minimum vertex cover benchmark suite')
+    parser.add_argument('--solvers', nargs='+', choices=list(SOLVERS), default=['dp-iterative', 'dp-vectorized'])
+    parser.add_argument('--families', nargs='+', choices=Generator.FAMILIES, default=['random'])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10 ** 4, 10 ** 5])
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--bnb-nodes', type=int, default=100, help='BnB solves the subgraph of vertices 1..K')
+    parser.add_argument('--batch-tree-size', type=int, default=16,
+                        help='vertices per tree for dp-batch and dp-per-tree')
+    parser.add_argument('--external-budget-mb', type=float, default=64,
+                        help='memory budget of dp-external (chunk size and mapped state)')
+    parser.add_argument('--updates', type=int, default=4000, help='tree updates per dp-dynamic run')
+    parser.add_argument('--ls-steps', type=int, default=20000, help='local search swap steps per run')
+    parser.add_argument('--ls-budget', type=float, default=60, help='local search time budget in seconds')
+    parser.add_argument('--bnb-cutoff', type=float, default=60, help='BnB cutoff time in seconds')
+    parser.add_argument('--format', nargs='+', choices=['json', 'csv'], default=['json', 'csv'])
+    parser.add_argument('--output', default=os.path.join('output', 'benchmark'), help='output path without extension')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown vs. baseline')
+    return parser.parse_args()
+
+
+def main():
+
+    args = parse_args()
+
+    records = []
+    for family in args.families:
+        for size in args.sizes:
+            for seed in args.seeds:
+                for solver in args.solvers:
+                    record = run_case(solver, family, size, seed, args)
+                    records.append(record)
+
+                    if record['error']:
+                        print(f'[Benchmark] {solver:<14} {family:<12} n={size:<9} seed={seed}: {record["error"]}')
+                    else:
+                        print(f'[Benchmark] {solver:<14} {family:<12} n={size:<9} seed={seed}: '
+                              f'{record["result"]} | median {record["median_ms"]:.2f} ms | '
+                              f'p95 {record["p95_ms"]:.2f} ms | peak {record["peak_mb"]:.2f} MB | '
+                              f'{record["nodes_per_s"]:.0f} nodes/s' +
+                              (f' | {record["nodes_explored"]} search nodes, bound {record["bound_ms"]:.2f} ms'
+                               if 'nodes_explored' in record else '') +
+                              (f' | {record["trees_per_s"]:.0f} trees/s' if 'trees_per_s' in record else '') +
+                              (f' | {record["update_us"]:.2f} us/update' if 'update_us' in record else '') +
+                              (f' | memo hit rate {record["memo_hit_rate"]:.1%} ({record["memo_hits"]} hits, '
+                               f'{record["memo_misses"]} misses)' if 'memo_hit_rate' in record else '') +
+                              (f' | {record["mb_per_s"]:.1f} MB/s' if 'mb_per_s' in record else ''))
+
+    add_speedup(records)
+    for r in records:
+        if 'speedup' in r:
+            print(f'[Benchmark] {r["solver"]:<14} {r["family"]:<12} n={r["size"]:<9} seed={r["seed"]}: '
+                  f'speedup {r["speedup"]:.2f}x with {r["workers"]} workers')
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(records, json.load(f), args.threshold)
+        for line in regressions:
+            print(line)
+
+    export(records, args.output, args.format)
+
+    print(f'[Benchmark] Results exported to {args.output}.{{{",".join(args.format)}}}')
+
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import itertools
+import random
+
+import networkx as nx
+
+from vertex_cover.bounds import BOUNDS, WEIGHTED_BOUNDS
+from vertex_cover.reductions import Reducer
+from vertex_cover.search_stats import SearchStats
+from vertex_cover.vc_bnb import BranchAndBound
+
+
+def is_cover(G, cover: set) -> bool:
+    return all(u in cover or v in cover for u in G for v in G[u] if u != v)
+
+
+def cost(cover, weights=None) -> int:
+    return len(cover) if weights is None else sum(weights[v] for v in cover)
+
+
+def brute_force(G, weights=None) -> set:
+    '''
+    minimum cover (least total weight with weights) over all vertex subsets
+    '''
+    best = set(G)
+    for k in range(len(G) + 1):
+        for cover in itertools.combinations(G, k):
+            if cost(cover, weights) < cost(best, weights) and is_cover(G, set(cover)):
+                best = set(cover)
+    return best
+
+
+def graphs(count: int, max_nodes: int, seed: int):
+    '''
+    small random graphs, sparse ones mostly reduce to an empty kernel
+    '''
+    rng = random.Random(seed)
+    for i in range(count):
+        n = rng.randint(1, max_nodes)
+        p = rng.choice([0.1, 0.2, 0.35, 0.5])
+        G = nx.gnp_random_graph(n, p, seed=rng.randrange(2 ** 32))
+        yield i, {v: list(G[v]) for v in G}
+
+
+def check_reductions(G) -> tuple[list[str], None]:
+    '''
+    a brute force cover of the kernel lifted back is an optimal cover of G
+    '''
+    reducer = Reducer()
+    kernel, ops = reducer.reduce(G)
+
+    cover = brute_force(kernel)
+    lifted = reducer.lift(cover, ops)
+    optimum, expected = len(cover), len(brute_force(G))
+
+    errors = []
+    if not is_cover(G, lifted):
+        errors.append('lifted cover misses an edge')
+    if len(lifted) != expected:
+        errors.append(f'lifted cover has {len(lifted)} vertices, optimum is {expected}')
+    if reducer.offset(ops) + optimum != expected:
+        errors.append(f'offset {reducer.offset(ops)} + kernel optimum {optimum} != optimum {expected}')
+    return errors, None
+
+
+def check_bnb(G, weights=None, **options) -> tuple[list[str], SearchStats]:
+    '''
+    BranchAndBound with the given options against the brute force optimum,
+    also returns the search stats
+    '''
+    OptVC, times, cutoff, _, stats = BranchAndBound(**options).solve(G, 60, weights=weights)
+    cover = {node for node, state in OptVC if state == 1}
+    size = cost(cover, weights)
+    expected = cost(brute_force(G, weights), weights)
+
+    errors = []
+    if cutoff:
+        errors.append('search hit the cutoff')
+    if not is_cover(G, cover):
+        errors.append('cover misses an edge')
+    if size != expected or (times and times[-1][0] != expected):
+        errors.append(f'cover of size {size} (reported {times[-1][0] if times else None}), optimum is {expected}')
+    return errors, stats
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Brute force check of the BnB reductions and transposition cache')
+    parser.add_argument('--graphs', type=int, default=200)
+    parser.add_argument('--max-nodes', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache-size', type=int, default=1024, help='transposition cache entries of the BnB runs')
+    return parser.parse_args()
+
+
+def main():
+
+    args = parse_args()
+
+    # without the heuristic upper bound the searches are long enough to revisit residual graphs
+    cache = {'cache_size': args.cache_size, 'warm_start': False}
+
+    failures = hits = lookups = 0
+    for i, G in graphs(args.graphs, args.max_nodes, args.seed):
+        rng = random.Random(args.seed * args.graphs + i)
+        weights = {v: rng.randint(1, 5) for v in G}
+
+        cases = [('reductions', lambda: check_reductions(G))]
+        cases += [(f'bnb-{bound}-cache', lambda bound=bound: check_bnb(G, bound=bound, **cache))
+                  for bound in BOUNDS]
+        cases += [('bnb-no-reduce-cache', lambda: check_bnb(G, reduce=False, **cache))]
+        cases += [(f'bnb-weighted-{bound}-cache', lambda bound=bound: check_bnb(G, weights, bound=bound, **cache))
+                  for bound in WEIGHTED_BOUNDS]
+
+        for name, check in cases:
+            errors, stats = check()
+            if stats is not None:
+                hits += stats.cache_hits
+                lookups += stats.cache_lookups
+
+            for error in errors:
+                failures += 1
+                print(f'[Check] FAIL {name:<28} graph {i} (n={len(G)}, m={sum(map(len, G.values())) // 2}): {error}')
+
+    print(f'[Check] {args.graphs} graphs, {failures} failures, {hits}/{lookups} transposition cache hits')
+
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,101 @@
+import argparse
+
+import numpy as np
+
+from utils.csr import CSRTree
+from utils.dataset import Generator
+from vertex_cover.vc_dp import DynamicProgramming
+
+
+# (name, adjacency list indexed 1..N, N) of graphs that are not trees
+MALFORMED = [
+    ('duplicate edge, unreachable vertex', [[], [2, 2], [1, 1], []], 3),
+    ('triangle, isolated vertex', [[], [2, 3], [1, 3], [1, 2], []], 4),
+    ('cycle', [[], [2, 4], [1, 3], [2, 4], [3, 1]], 4),
+    ('duplicate edge below the root', [[], [2], [1, 3, 3], [2, 2], []], 4),
+    ('disconnected', [[], [2], [1], []], 3),
+]
+
+
+# recursive mode recurses once per level, deeper trees hit the recursion limit
+RECURSIVE_MAX = 500
+
+
+def check_modes(tree: CSRTree, weights=None) -> list[str]:
+    '''
+    every DP mode gives the same cover size, and the reconstructed cover has that size
+    '''
+    adj = tree.adjacency()
+    modes = [mode for mode in DynamicProgramming.MODES if mode != 'recursive' or tree.N <= RECURSIVE_MAX]
+
+    results = {}
+    for mode in modes:
+        # recursive mode works on the adjacency list, the others on bare CSR arrays
+        case = adj if mode == 'recursive' else CSRTree(tree.offsets, tree.neighbors, tree.N, tree.root)
+        dp = DynamicProgramming()
+        results[mode] = dp.solve(case, tree.N, mode, weights=weights)[0]
+
+        if mode != 'recursive':
+            cover = dp.cover()
+            cost = cover.sum() if weights is None else weights[cover].sum()
+            if not np.isclose(cost, results[mode]):
+                return [f'{mode} cover costs {cost}, solve returned {results[mode]}']
+
+    if len(set(results.values())) > 1:
+        return [f'modes disagree: {results}']
+    return []
+
+
+def check_malformed() -> list[str]:
+    '''
+    graphs that are not trees raise ValueError in the iterative and vectorized modes
+    '''
+    errors = []
+    for name, adj, N in MALFORMED:
+        for mode in ('iterative', 'vectorized'):
+            try:
+                result = DynamicProgramming().solve(adj, N, mode)
+            except ValueError:
+                continue
+            errors.append(f'{mode} solved "{name}" to {result} instead of raising ValueError')
+    return errors
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Cross check of the tree DP modes and their input validation')
+    parser.add_argument('--families', nargs='+', choices=Generator.FAMILIES, default=list(Generator.FAMILIES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1, 2, 17, 1000])
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0, 1, 2])
+    return parser.parse_args()
+
+
+def main():
+
+    args = parse_args()
+
+    failures = 0
+    for error in check_malformed():
+        failures += 1
+        print(f'[Check] FAIL malformed: {error}')
+
+    generator = Generator()
+    for family in args.families:
+        for size in args.sizes:
+            for seed in args.seeds:
+                tree = CSRTree.from_parent(generator.random_parent_array(size, family, seed))
+                weights = generator.random_weights(size, seed)
+                for name, w in (('unweighted', None), ('weighted', weights)):
+                    for error in check_modes(tree, w):
+                        failures += 1
+                        print(f'[Check] FAIL {family:<12} n={size:<6} seed={seed} {name}: {error}')
+
+    print(f'[Check] {len(MALFORMED)} malformed graphs, {len(args.families) * len(args.sizes) * len(args.seeds)} trees, '
+          f'{failures} failures')
+
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+
+    main()
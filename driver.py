@@ -1,15 +1,21 @@
 import os
+import json
 import time
+import argparse
 
 import networkx as nx
 import matplotlib.pyplot as plt
 import psutil
 
+from utils.csr import CSRTree
 from utils.dataset import Generator
+from utils.loader import DatasetLoader
+from utils.profiler import Profiler
 from utils.visualizer import Visualizer 
 
 from vertex_cover.vc_bnb import BranchAndBound
 from vertex_cover.vc_dp import DynamicProgramming
+from vertex_cover.vc_ls import LocalSearch
 
 
 def process_memory() -> int:
@@ -22,46 +28,60 @@ def process_memory() -> int:
     return mem_info.rss / (1024 ** 2)   # bytes to MB
 
 
-def vertex_cover_dp(adj_list: dict, N: int) -> set:
+def vertex_cover_dp(adj_list: dict, N: int, mode: str = 'iterative', cover_filename: str = None,
+                    profiler: Profiler = None, weights=None) -> set:
     '''
-    Run dynamic programming solution for vertex cover
+    Run dynamic programming solution for vertex cover,
+    optionally exporting the cover bitmap to ./output/,
+    minimizes total weight if weights[0..N] are given
     '''
 
-    # convert adj_list to valid format
-    temp = [[] for i in range(N + 1)]
-    for i in range(1, N + 1):
-        temp[i] = adj_list[i]
-    adj_list = temp
+    # convert adj_list to valid format, CSR trees are consumed directly
+    if not isinstance(adj_list, CSRTree):
+        temp = [[] for i in range(N + 1)]
+        for i in range(1, N + 1):
+            temp[i] = adj_list[i]
+        adj_list = temp
     
     dp = DynamicProgramming()
     
     time_start = time.perf_counter()
 
-    vc, mem_usage = dp.solve(adj_list, N)
+    vc, mem_usage = dp.solve(adj_list, N, mode, profiler, weights)
 
     time_end = time.perf_counter()
 
     elapsed = (time_end - time_start) * 1000  # to ms
 
+    if cover_filename is not None:
+        dp.export_cover(dp.cover(), cover_filename)
+
     return vc, elapsed, mem_usage
 
 
-def vertex_cover_bnb(adj_list: dict, N: int, cutoff_time: int) -> set:
+def vertex_cover_bnb(adj_list: dict, N: int, cutoff_time: int, profiler: Profiler = None, weights=None) -> set:
     '''
     Run branch and bound solution for vertex cover,
     only calculating either 100, 300, or 900 tree nodes.
+    minimizes total weight if weights[0..N] are given
     '''
 
-    G = nx.from_dict_of_lists(adj_list)
-
     subgraph = {
         10 ** 4: 100,
         10 ** 5: 300,
         10 ** 6: 900
     }
+    K = subgraph.get(N, min(N, 100))
 
-    nodes = [i for i in range(1, subgraph[N] + 1)]
-    subtree = G.subgraph(nodes)
+    if isinstance(adj_list, CSRTree):
+        subtree = nx.Graph()
+        subtree.add_nodes_from(range(1, K + 1))
+        subtree.add_edges_from(adj_list.subgraph_edges(K).tolist())
+    else:
+        G = nx.from_dict_of_lists(adj_list)
+
+        nodes = [i for i in range(1, K + 1)]
+        subtree = G.subgraph(nodes)
 
     '''Uncomment to visualize calculated subgraph'''
     # viz = Visualizer()
@@ -71,55 +91,181 @@ def vertex_cover_bnb(adj_list: dict, N: int, cutoff_time: int) -> set:
 
     bnb = BranchAndBound()
 
+    def progress(event: dict) -> None:
+        print(f'[BnB] Found vertex cover of size {event["size"]} after {event["time"] * 1000:.2f} ms '
+              f'({event["nodes"]} search nodes).')
+
     time_start = time.perf_counter()
 
-    vc, times, cutoff, mem_usage = bnb.solve(subtree, cutoff_time)
+    if weights is not None:
+        weights = weights[:K + 1].tolist()
+
+    vc, times, cutoff, mem_usage, stats = bnb.solve(subtree, cutoff_time, profiler, progress, weights)
 
     time_end = time.perf_counter()
 
-    for element in vc:
-        if element[1]==0:
-            vc.remove(element)
+    # keep only vertices in the cover (state 1)
+    vc = [element for element in vc if element[1] == 1]
+    result = len(vc) if weights is None else bnb.vc_size(vc, weights)
 
     elapsed = (time_end - time_start) * 1000  # to ms
     print(f'[BnB] Times for solutions: {times}')
+    print(f'[BnB] Search: {stats.nodes} nodes, {stats.prunes} pruned, {stats.solutions} solutions, '
+          f'max depth {stats.max_depth}, {stats.restored} vertices restored on backtracking.')
 
-    return len(vc), elapsed, mem_usage, cutoff, times
-    
+    return result, elapsed, mem_usage, cutoff, times, stats
 
-def main():
 
-    # initialize size of tree
-    N = {
-        'small': 10 ** 4,
-        'medium': 10 ** 5,
-        'large': 10 ** 6
-    }
+def vertex_cover_ls(adj_list: dict, N: int, budget: float, seed: int = None, profiler: Profiler = None) -> set:
+    '''
+    Run local search for vertex cover on the whole graph,
+    improving the cover until the time budget (seconds) runs out
+    '''
 
-    BNB_CUTOFF_TIME = 600
+    tree = adj_list if isinstance(adj_list, CSRTree) else CSRTree.from_adjacency(adj_list, N)
+
+    ls = LocalSearch(seed)
+
+    time_start = time.perf_counter()
+
+    vc, times, cutoff, mem_usage = ls.solve(tree, budget, profiler)
+
+    time_end = time.perf_counter()
+
+    elapsed = (time_end - time_start) * 1000  # to ms
+    print(f'[LS] {ls.steps} steps, {len(times) - 1} improvements on the initial cover of size {ls.initial_size}, '
+          f'matching lower bound {ls.lower_bound}.')
+
+    return len(vc), elapsed, mem_usage, cutoff, times, ls.steps
 
-    # leave parameter empty for default generator values (10^4, 10^5, 10^5)
-    generator = Generator(N['small'], N['medium'], N['large'])
 
+def benchmark_dp(filename: str, repeats: int = 5) -> None:
+    '''
+    Compare every DP mode on an existing dataset,
+    reports best of `repeats` runs
+    '''
+
+    adj_list = Generator().import_adjacency_list(filename)
+    N = len(adj_list) - 1
+
+    lines = [f'[DP] Benchmark on {filename} ({N} nodes), best of {repeats} runs\n']
+
+    for mode in DynamicProgramming.MODES:
+        best = None
+        for _ in range(repeats):
+            result, elapsed, _ = vertex_cover_dp(adj_list, N, mode)
+            best = elapsed if best is None else min(best, elapsed)
+
+        lines.append(f'[DP] {mode:<10}: {result} in {best:.2f} ms.\n')
+
+    name = os.path.splitext(os.path.basename(filename))[0]
+    with open(os.path.join(os.getcwd(), 'output', f'{name}_dp_benchmark.txt'), "w") as f:
+        for line in lines:
+            print(line, end='')
+            f.write(line)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Minimum vertex cover: DP vs BnB')
+    parser.add_argument('--family', choices=Generator.FAMILIES,
+                        help='generate trees of this family with the vectorized generator')
+    parser.add_argument('--seed', type=int, help='seed for --family')
+    parser.add_argument('--dp-mode', choices=DynamicProgramming.MODES, default='iterative',
+                        help='tree DP engine')
+    parser.add_argument('--dataset', nargs='+', metavar='FILE',
+                        help='solve existing dataset files instead of generating new ones')
+    parser.add_argument('--export-cover', action='store_true',
+                        help='export DP cover bitmaps to ./output/<size>_cover.bin')
+    parser.add_argument('--weighted', action='store_true',
+                        help='minimize cover weight, weights are read from <dataset file>.w.npy '
+                             '(with --dataset) or drawn and saved next to the generated datasets')
+    parser.add_argument('--ls-budget', type=float, metavar='SECONDS',
+                        help='also run local search on the whole graph with this time budget '
+                             '(unweighted, seeded with --seed)')
+    parser.add_argument('--benchmark-dp', metavar='FILE',
+                        help='compare DP modes on a dataset in ./analysis_datasets/')
+    args = parser.parse_args()
+    if args.ls_budget is not None and args.weighted:
+        parser.error('--ls-budget minimizes the cover size, it cannot be combined with --weighted')
+    return args
+
+
+def main():
+
+    args = parse_args()
+
+    if args.benchmark_dp:
+        benchmark_dp(args.benchmark_dp)
+        return
+
+    BNB_CUTOFF_TIME = 600
 
     print('''
         Rayhan Putra Randi
         2106705644 - DAA A - 1
           ''')
-    
 
-    print('Generating dataset...')
-    
-    dataset = generator.generate()
+    # structured results, exported next to the text output
+    load_ms = {}
 
-    print('Dataset generated.\n')
+    if args.dataset:
 
-    print(f'''
-          Solving for sizes:
-          Small : {N['small']}
-          Medium: {N['medium']}
-          Large : {N['large']}
-          ''')
+        print('Loading dataset...')
+
+        loader = DatasetLoader()
+        dataset = {}
+        weights = {}
+        for filename in args.dataset:
+            size = os.path.splitext(os.path.basename(filename))[0]
+            with Profiler() as profiler:
+                with profiler.phase('load'):
+                    dataset[size] = loader.load(filename)
+                    if args.weighted:
+                        weights[size] = loader.load_weights(filename, dataset[size].N)
+            load_ms[size] = profiler.phases['load'] * 1000  # to ms
+
+            if args.weighted and weights[size] is None:
+                raise SystemExit(f'[Weights] {loader.weights_path(filename)} not found')
+        N = {size: tree.N for size, tree in dataset.items()}
+
+        print('Dataset loaded.\n')
+
+    else:
+
+        # initialize size of tree
+        N = {
+            'small': 10 ** 4,
+            'medium': 10 ** 5,
+            'large': 10 ** 6
+        }
+
+        # leave parameter empty for default generator values (10^4, 10^5, 10^5)
+        generator = Generator(N['small'], N['medium'], N['large'])
+
+        print('Generating dataset...')
+
+        if args.family is None:
+            dataset = {size: adj_list for size, (tree_root, adj_list) in generator.generate().items()}
+        else:
+            dataset = {
+                size: generator.generate_tree(N[size], args.family, args.seed, f'{size}.par')
+                for size in N
+            }
+
+        weights = {}
+        if args.weighted:
+            extension = 'txt' if args.family is None else 'par'
+            weights = {
+                size: generator.random_weights(N[size], args.seed, export_filename=f'{size}.{extension}')
+                for size in N
+            }
+
+        print('Dataset generated.\n')
+
+    print('\n          Solving for sizes:')
+    for size in N:
+        print(f'          {size.capitalize():<7}: {N[size]}')
+    print()
 
     for size in dataset:
 
@@ -127,19 +273,25 @@ def main():
 
         with open(os.path.join(os.getcwd(), 'output', filename), "w") as f:
         
-            tree_root, adj_list = dataset[size]
+            adj_list = dataset[size]
 
             header_dp = f'[DP] Solving for size {size} ({N[size]})...\n'
 
             print(header_dp, end='')
             f.write(header_dp)
 
-            dp_result, dp_time, dp_mem = vertex_cover_dp(adj_list, len(adj_list))
+            with Profiler() as dp_profiler:
+                dp_result, dp_time, dp_mem = vertex_cover_dp(
+                    adj_list, N[size], args.dp_mode,
+                    f'{size}_cover.bin' if args.export_cover else None,
+                    dp_profiler, weights.get(size)
+                )
 
             print('[DP] Done.')
             f.write('[DP] Done.\n')
 
-            dp_write_result = f'[DP] Total minimum vertex cover: {dp_result}\n'
+            measure = 'weight' if args.weighted else 'vertex cover'
+            dp_write_result = f'[DP] Total minimum {measure}: {dp_result}\n'
             dp_write_time = f'[DP] Elapsed time: {dp_time:.2f} ms.\n'
             dp_write_mem = f'[DP] Memory usage: {dp_mem} MB.\n\n'
 
@@ -157,7 +309,10 @@ def main():
             print(header_bnb, end='')
             f.write(header_bnb)
 
-            bnb_result, bnb_time, bnb_mem, cutoff, times = vertex_cover_bnb(adj_list, len(adj_list), BNB_CUTOFF_TIME)
+            with Profiler() as bnb_profiler:
+                bnb_result, bnb_time, bnb_mem, cutoff, times, search_stats = vertex_cover_bnb(
+                    adj_list, N[size], BNB_CUTOFF_TIME, bnb_profiler, weights.get(size)
+                )
 
             print('[BnB] Done.')
             f.write('[BnB] Done.\n')
@@ -167,10 +322,10 @@ def main():
                 print(bnb_write_cutoff, end='\n')
                 f.write(bnb_write_cutoff + '\n')
 
-                bnb_write_result = f'[BnB] Found vertex cover: {bnb_result}\n'
+                bnb_write_result = f'[BnB] Found {measure}: {bnb_result}\n'
                 
             else:
-                bnb_write_result = f'[BnB] Total minimum vertex cover: {bnb_result}\n'
+                bnb_write_result = f'[BnB] Total minimum {measure}: {bnb_result}\n'
 
             bnb_write_time = f'[BnB] Elapsed time for found vertex cover: {(times[-1][-1] * 1000):.2f} ms.\n'  # to ms
             bnb_write_total_time = f'[BnB] Total elapsed time: {bnb_time:.2f} ms.\n'
@@ -189,21 +344,65 @@ def main():
             print(bnb_write_mem, end='')
             f.write(bnb_write_mem)
 
-            print('\n')
-            f.write('\n\n')
+            if args.ls_budget is not None:
+                header_ls = f'\n[LS] Solving for size {size} ({N[size]}) (time budget {args.ls_budget}s)...\n'
+
+                print(header_ls, end='')
+                f.write(header_ls)
+
+                with Profiler() as ls_profiler:
+                    ls_result, ls_time, ls_mem, ls_cutoff, ls_times, ls_steps = vertex_cover_ls(
+                        adj_list, N[size], args.ls_budget, args.seed, ls_profiler
+                    )
 
-            '''
-            Uncomment to visualize full tree
-            '''
-            # G = nx.from_dict_of_lists(adj_list)
+                print('[LS] Done.')
+                f.write('[LS] Done.\n')
 
-            # print("Adjacency List:")
-            # print(adj_list)
+                ls_lines = [
+                    f'[LS] Found vertex cover: {ls_result}\n' if ls_cutoff
+                    else f'[LS] Total minimum vertex cover: {ls_result}\n',
+                    f'[LS] Elapsed time for found vertex cover: {(ls_times[-1][-1] * 1000):.2f} ms.\n',  # to ms
+                    f'[LS] Total elapsed time: {ls_time:.2f} ms.\n',
+                    f'[LS] Memory usage: {ls_mem} MB.\n',
+                ]
+                for line in ls_lines:
+                    print(line, end='')
+                    f.write(line)
+
+            print('\n')
+            f.write('\n\n')
 
-            # viz = Visualizer()
-            # pos = viz.hierarchy_pos(G, 1)
-            # nx.draw(G, pos, with_labels=True)
-            # plt.show()
+        results = {
+            'size': size,
+            'N': N[size],
+            'load_ms': load_ms.get(size),
+            'weighted': args.weighted,
+            'dp': {'mode': args.dp_mode, 'result': dp_result, 'elapsed_ms': dp_time, **dp_profiler.report()},
+            'bnb': {
+                'result': bnb_result, 'elapsed_ms': bnb_time, 'cutoff': cutoff,
+                'times': times, 'search': search_stats.as_dict(), **bnb_profiler.report()
+            },
+        }
+        if args.ls_budget is not None:
+            results['ls'] = {
+                'result': ls_result, 'elapsed_ms': ls_time, 'cutoff': ls_cutoff,
+                'times': ls_times, 'steps': ls_steps, **ls_profiler.report()
+            }
+        with open(os.path.join(os.getcwd(), 'output', f'{size}_output.json'), "w") as f:
+            json.dump(results, f, indent=2)
+
+        '''
+        Uncomment to visualize full tree
+        '''
+        # G = nx.from_dict_of_lists(adj_list)
+
+        # print("Adjacency List:")
+        # print(adj_list)
+
+        # viz = Visualizer()
+        # pos = viz.hierarchy_pos(G, 1)
+        # nx.draw(G, pos, with_labels=True)
+        # plt.show()
     
     print('''
           Done.
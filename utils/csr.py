@@ -0,0 +1,238 @@
+import itertools
+
+import numpy as np
+
+
+class CSRTree:
+    '''
+    Flat array representation of a tree on vertices 1..N
+
+    offsets   : neighbors of v are neighbors[offsets[v]:offsets[v + 1]]
+    neighbors : concatenated adjacency lists
+    parent    : parent of every vertex when rooted at root (0 for the root)
+    order     : BFS order starting from root
+    levels    : order[levels[k]:levels[k + 1]] are the vertices at depth k
+    '''
+
+    def __init__(self, offsets: np.ndarray, neighbors: np.ndarray, N: int, root: int = 1):
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.N = N
+        self.root = root
+        self.parent = None
+        self.order = None
+        self.levels = None
+
+    @classmethod
+    def from_adjacency(cls, adj, N: int, root: int = 1) -> 'CSRTree':
+        '''
+        builds CSR arrays from an adjacency list indexed 1..N (list or dict)
+        '''
+        degree = np.fromiter((len(adj[i]) for i in range(1, N + 1)), dtype=np.int64, count=N)
+
+        offsets = np.zeros(N + 2, dtype=np.int64)
+        np.cumsum(degree, out=offsets[2:])
+
+        neighbors = np.fromiter(
+            itertools.chain.from_iterable(adj[i] for i in range(1, N + 1)),
+            dtype=np.int32,
+            count=int(offsets[-1])
+        )
+
+        return cls(offsets, neighbors, N, root)
+
+    @classmethod
+    def from_parent(cls, parent: np.ndarray, root: int = None) -> 'CSRTree':
+        '''
+        builds CSR arrays from a parent array indexed 0..N,
+        parent[v] == 0 marks the root
+        '''
+        N = parent.size - 1
+        child = np.flatnonzero(parent[1:]).astype(np.int32) + 1
+        par = parent[child].astype(np.int32)
+
+        if root is None:
+            roots = np.flatnonzero(parent[1:] == 0) + 1
+            root = int(roots[0]) if roots.size else 1
+
+        # every edge once in each direction, grouped by source vertex
+        src = np.concatenate((child, par))
+        dst = np.concatenate((par, child))
+        by_src = np.argsort(src, kind='stable')
+
+        offsets = np.zeros(N + 2, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=N + 1)[1:], out=offsets[2:])
+
+        tree = cls(offsets, dst[by_src], N, root)
+        if parent[root] == 0:
+            tree.parent = parent
+        return tree
+
+    @staticmethod
+    def forest_parent(offsets: np.ndarray, neighbors: np.ndarray, roots: np.ndarray) -> np.ndarray:
+        '''
+        parent array of a forest given as CSR on vertices 0..M-1 (offsets of length M + 1),
+        one vectorized BFS step per level from all roots at once, -1 marks the roots
+        '''
+        M = offsets.size - 1
+        parent = np.full(M, -1, dtype=np.int32)
+        visited = np.zeros(M, dtype=np.bool_)
+
+        frontier = np.asarray(roots, dtype=np.int32)
+        visited[frontier] = True
+
+        while frontier.size:
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+
+            shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            nbrs = neighbors[np.arange(total) + shift]
+            src = np.repeat(frontier, counts)
+
+            keep = nbrs != parent[src]
+            nbrs, src = nbrs[keep], src[keep]
+
+            # in a forest the parent is the only visited neighbor
+            if visited[nbrs].any() or np.unique(nbrs).size != nbrs.size:
+                raise ValueError('graph is not a forest')
+
+            visited[nbrs] = True
+            parent[nbrs] = src
+            frontier = nbrs
+
+        if not visited.all():
+            raise ValueError('forest has vertices not reachable from a root')
+
+        return parent
+
+    def adjacency(self) -> list[list[int]]:
+        '''
+        adjacency list indexed 1..N, index 0 is left empty
+        '''
+        neighbors = self.neighbors.tolist()
+        offsets = self.offsets.tolist()
+        return [[]] + [neighbors[offsets[v]:offsets[v + 1]] for v in range(1, self.N + 1)]
+
+    def subgraph_edges(self, K: int) -> np.ndarray:
+        '''
+        edges (u, v) with u < v <= K, as an array of shape (E, 2)
+        '''
+        end = self.offsets[K + 1]
+        src = np.repeat(np.arange(1, K + 1, dtype=np.int32), np.diff(self.offsets[1:K + 2]))
+        dst = self.neighbors[:end]
+
+        keep = (src < dst) & (dst <= K)
+        return np.stack((src[keep], dst[keep]), axis=1)
+
+    def bfs(self) -> None:
+        '''
+        computes parent array and BFS order iteratively
+        '''
+        N = self.N
+
+        parent = np.zeros(N + 1, dtype=np.int32)
+        order = np.empty(N, dtype=np.int32)
+
+        # memoryviews give fast scalar access without per-element numpy objects
+        offsets = memoryview(self.offsets)
+        neighbors = memoryview(self.neighbors)
+        par = memoryview(parent)
+        seq = memoryview(order)
+
+        root = self.root
+        seq[0] = root
+        tail = 1
+
+        for head in range(N):
+            if head == tail:
+                raise ValueError('tree is not connected')
+
+            v = seq[head]
+            p = par[v]
+            for u in neighbors[offsets[v]:offsets[v + 1]]:
+                if u != p:
+                    # reached twice through a cycle or a duplicate edge
+                    if par[u] or u == root:
+                        raise ValueError('graph is not a tree')
+                    par[u] = v
+                    seq[tail] = u
+                    tail += 1
+
+        self.parent = parent
+        self.order = order
+
+    def ensure_bfs(self) -> None:
+        '''
+        computes parent array and BFS order if not yet available
+        '''
+        if self.order is None:
+            self.bfs()
+
+    def bfs_levels(self) -> None:
+        '''
+        computes parent array, BFS order and depth level boundaries,
+        one vectorized step per level.
+        children of a vertex are contiguous within their level and
+        appear in the order of their parents
+        '''
+        N = self.N
+        offsets, neighbors = self.offsets, self.neighbors
+
+        parent = np.zeros(N + 1, dtype=np.int32)
+        frontier = np.array([self.root], dtype=np.int32)
+        levels = [frontier]
+        visited = 1
+
+        # the root is marked reached by a parent that is no vertex until the end, and slot
+        # keeps the last position of every vertex in its level to find repeats there
+        parent[self.root] = -1
+        slot = np.empty(N + 1, dtype=np.int32)
+        positions = np.arange(N, dtype=np.int32)
+
+        while True:
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+
+            # position of every neighbor of every frontier vertex in neighbors
+            shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            nbrs = neighbors[np.arange(total) + shift]
+            src = np.repeat(frontier, counts)
+
+            keep = nbrs != parent[src]
+            frontier = nbrs[keep]
+            if frontier.size == 0:
+                break
+
+            # in a tree nothing is reached twice, the totals alone miss a duplicate
+            # edge that makes up for an unreachable vertex
+            visited += frontier.size
+            if visited > N or parent[frontier].any():
+                raise ValueError('graph is not a tree')
+            slot[frontier] = positions[:frontier.size]
+            if (slot[frontier] != positions[:frontier.size]).any():
+                raise ValueError('graph is not a tree')
+
+            parent[frontier] = src[keep]
+            levels.append(frontier)
+
+        parent[self.root] = 0
+        if visited != N:
+            raise ValueError('tree is not connected')
+
+        self.parent = parent
+        self.order = np.concatenate(levels)
+        self.levels = np.zeros(len(levels) + 1, dtype=np.int64)
+        np.cumsum([level.size for level in levels], out=self.levels[1:])
+
+    def ensure_levels(self) -> None:
+        '''
+        computes level boundaries if not yet available
+        '''
+        if self.levels is None:
+            self.bfs_levels()
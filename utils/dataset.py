@@ -1,6 +1,11 @@
 import os
 import random
 
+import numpy as np
+
+from utils.csr import CSRTree
+from utils.loader import DatasetLoader, KIND_PARENT
+
 
 class TreeNode:
     '''
@@ -38,17 +43,35 @@ class Generator:
 
         return adj_list
     
-    def export_adjacency_list(self, adj_list: dict, filename: str) -> None:
+    def export_adjacency_list(self, adj_list: dict, filename: str, binary: bool = False) -> None:
         '''
-        exports adjacency list to txtfile
+        exports adjacency list to txtfile,
+        or to the binary CSR format read by DatasetLoader
         '''
         n = len(adj_list)
 
+        if binary:
+            tree = CSRTree.from_adjacency(adj_list, n)
+            DatasetLoader().write_binary(tree, os.path.join(os.getcwd(), 'analysis_datasets', filename))
+            return
+
         with open(os.path.join(os.getcwd(), 'analysis_datasets', filename), "w") as f:
             for i in range(1, n+1):
                 f.write(' '.join(map(str, adj_list[i])))
                 f.write('\n')
 
+    def import_adjacency_list(self, filename: str) -> list[list[int]]:
+        '''
+        imports adjacency list from txtfile, index 0 is left empty
+        '''
+        adj_list = [[]]
+
+        with open(os.path.join(os.getcwd(), 'analysis_datasets', filename), "r") as f:
+            for line in f:
+                adj_list.append([int(x) for x in line.split()])
+
+        return adj_list
+
     def generate_random_tree(self, n: int, export_filename: str) -> set:
         if n == 0:
             return None
@@ -76,6 +99,119 @@ class Generator:
         return root, adj_list
     
     
+    FAMILIES = ('random', 'uniform', 'path', 'star', 'caterpillar', 'bounded')
+
+    def random_parent_array(self, n: int, family: str = 'random', seed=None,
+                            spine: float = 0.1, max_children: int = 3) -> np.ndarray:
+        '''
+        draws a parent array for a tree on vertices 1..n without per-node
+        python work, parent[1] == 0 marks vertex 1 as root
+
+        random      : parent[i] uniform on 1..i-1, same as generate_random_tree
+        uniform     : uniformly random labeled tree (same law as a random Prufer sequence)
+        path        : parent[i] = i - 1
+        star        : parent[i] = 1
+        caterpillar : spine path of n * spine vertices, others hang off random spine vertices
+        bounded     : at most max_children children per vertex, built level by level
+        '''
+        if family not in self.FAMILIES:
+            raise ValueError(f'unknown tree family: {family}')
+
+        rng = np.random.default_rng(seed)
+        parent = np.zeros(n + 1, dtype=np.int32)
+        if n < 2:
+            return parent
+
+        i = np.arange(2, n + 1)
+
+        if family == 'random':
+            parent[2:] = 1 + (rng.random(n - 1) * (i - 1)).astype(np.int32)
+
+        elif family == 'uniform':
+            # first-entrance tree of a random walk on the complete graph (aldous-broder):
+            # the k-th newly visited vertex hangs off the (k-1)-th one with
+            # probability (n - k) / n, otherwise off a uniform earlier one
+            k = np.arange(1, n)
+            previous = rng.random(n - 1) < (n - k) / n
+            attach = np.where(previous, k - 1, (rng.random(n - 1) * k).astype(np.int64))
+
+            # relabel in walk order, the walk starts at the root
+            label = np.empty(n, dtype=np.int32)
+            label[0] = 1
+            label[1:] = rng.permutation(n - 1) + 2
+            parent[label[1:]] = label[attach]
+
+        elif family == 'path':
+            parent[2:] = i - 1
+
+        elif family == 'star':
+            parent[2:] = 1
+
+        elif family == 'caterpillar':
+            length = min(n, max(1, int(n * spine)))
+            parent[2:length + 1] = np.arange(1, length)
+            parent[length + 1:] = 1 + rng.integers(0, length, size=n - length)
+
+        elif family == 'bounded':
+            # vertices are numbered level by level, every level picks distinct
+            # child slots among the max_children slots of the previous level
+            lo, hi = 1, 2
+            while hi <= n:
+                slots = max_children * (hi - lo)
+                size = min(n + 1 - hi, int(rng.integers(max(1, slots // 2), slots + 1)))
+                taken = np.sort(rng.choice(slots, size=size, replace=False))
+                parent[hi:hi + size] = lo + taken // max_children
+                lo, hi = hi, hi + size
+
+        return parent
+
+    def random_forest(self, trees: int, size: int, seed=None) -> np.ndarray:
+        '''
+        parent array of `trees` random recursive trees with `size` vertices each, as
+        taken by DynamicProgramming.solve_batch: tree t is made of the vertices
+        t * size..(t + 1) * size - 1 and rooted at the first of them, -1 marks roots
+        '''
+        rng = np.random.default_rng(seed)
+        local = np.tile(np.arange(size, dtype=np.int64), trees)
+        base = np.repeat(np.arange(trees, dtype=np.int64) * size, size)
+
+        parent = (base + (rng.random(trees * size) * local).astype(np.int64)).astype(np.int32)
+        parent[local == 0] = -1
+        return parent
+
+    def random_weights(self, n: int, seed=None, high: int = 10, integer: bool = True,
+                       export_filename: str = None) -> np.ndarray:
+        '''
+        weights[0..n] for vertices 1..n (weights[0] is 0), integers on 1..high or
+        floats on (0, high], optionally saved next to the dataset export_filename
+        '''
+        rng = np.random.default_rng(seed)
+        if integer:
+            weights = rng.integers(1, high + 1, size=n + 1, dtype=np.int64)
+        else:
+            weights = high * (1 - rng.random(n + 1))
+        weights[0] = 0
+
+        if export_filename is not None:
+            path = os.path.join(os.getcwd(), 'analysis_datasets', export_filename)
+            DatasetLoader().write_weights(weights, path)
+
+        return weights
+
+    def generate_tree(self, n: int, family: str = 'random', seed=None,
+                      export_filename: str = None, **params) -> CSRTree:
+        '''
+        generates a tree of the given family as CSR arrays,
+        optionally exported as binary parent array
+        '''
+        tree = CSRTree.from_parent(self.random_parent_array(n, family, seed, **params), root=1)
+
+        if export_filename is not None:
+            path = os.path.join(os.getcwd(), 'analysis_datasets', export_filename)
+            DatasetLoader().write_binary(tree, path, kind=KIND_PARENT)
+
+        return tree
+
     def generate(self) -> dict:
         return {
             'small': self.generate_random_tree(self.SMALL, 'small.txt'),
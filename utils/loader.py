@@ -0,0 +1,488 @@
+import os
+import mmap
+import tempfile
+
+import numpy as np
+
+from utils.csr import CSRTree
+
+
+# binary dataset layout, all fields little-endian:
+#   header  : HEADER (64 bytes)
+#   CSR     : offsets int64[N + 2], neighbors int32[M]
+#   parent  : parent int32[N + 1]
+#   depth   : DEPTH_RECORD[N], deepest vertices first (see write_depth_sorted)
+MAGIC = b'MVCTREE\0'
+VERSION = 1
+
+KIND_PARENT = 0
+KIND_CSR = 1
+KIND_DEPTH = 2
+
+# vertex id and record index of its parent (-1 for a root)
+DEPTH_RECORD = np.dtype([('vertex', '<i4'), ('parent', '<i4')])
+
+# pointer jumping state of write_depth_sorted_external: an ancestor and the distance to it,
+# side by side so a random read of both is one page fault
+JUMP = np.dtype([('anc', '<i4'), ('depth', '<i4')])
+
+HEADER = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('kind', '<u4'),
+    ('N', '<u8'),
+    ('M', '<u8'),
+    ('src_mtime_ns', '<i8'),     # source text file, for cache invalidation
+    ('src_size', '<u8'),
+    ('reserved', 'V16'),
+])
+
+
+def make_header(kind: int, N: int, M: int = 0, source: os.stat_result = None) -> bytes:
+    '''
+    HEADER record of a binary file, source is the stat of the text file it was converted from
+    '''
+    header = np.zeros(1, dtype=HEADER)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['kind'] = kind
+    header['N'] = N
+    header['M'] = M
+
+    if source is not None:
+        header['src_mtime_ns'] = source.st_mtime_ns
+        header['src_size'] = source.st_size
+
+    return header.tobytes()
+
+
+def drop_pages(*maps: mmap.mmap) -> None:
+    '''
+    releases the pages of memory maps from the process (the data stays in the file and the
+    page cache), so RSS does not grow with the size of a file that is streamed in chunks
+    '''
+    for mm in maps:
+        if hasattr(mm, 'madvise'):
+            mm.madvise(mmap.MADV_DONTNEED)
+
+
+def atomic_write(path: str, writer) -> None:
+    '''
+    calls writer(f) on a fresh temporary file in the directory of path and moves it over
+    path once writer returns, so readers never see a partial file and concurrent writers
+    never share a temporary name. on error the temporary file is removed
+    '''
+    f = tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + '.', suffix='.tmp', delete=False)
+    try:
+        with f:
+            writer(f)
+
+        # temporary files are created private, give the result the usual permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(f.name, 0o666 & ~umask)
+
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+
+class DatasetLoader:
+    '''
+    Functions to load line-per-vertex adjacency files
+    (as written by Generator.export_adjacency_list) straight into CSR arrays,
+    and to read/write the compact binary format
+    '''
+
+    # bytes of numpy temporaries per vertex of a write_depth_sorted_external chunk
+    EXTERNAL_COST = 64
+
+    def __init__(self, chunk_size: int = 1 << 23):
+        self.chunk_size = chunk_size
+
+    def resolve(self, filename: str) -> str:
+        '''
+        accepts a path, or a bare name inside ./analysis_datasets/
+        '''
+        if os.path.exists(filename):
+            return filename
+        return os.path.join(os.getcwd(), 'analysis_datasets', filename)
+
+    def load(self, filename: str, root: int = 1) -> CSRTree:
+        '''
+        loads binary or text dataset, text is converted once into a
+        .csr cache next to it that is reused while the text file is unchanged
+        '''
+        path = self.resolve(filename)
+
+        if self.is_binary(path):
+            return self.load_binary(path, root)
+
+        cache = os.path.splitext(path)[0] + '.csr'
+        stat = os.stat(path)
+
+        if os.path.exists(cache):
+            header = self.read_header(cache)
+            if (header is not None
+                    and header['src_mtime_ns'] == stat.st_mtime_ns
+                    and header['src_size'] == stat.st_size):
+                return self.load_binary(cache, root)
+
+        tree = self.load_text(path, root)
+        self.write_binary(tree, cache, source=stat)
+
+        return tree
+
+    def is_binary(self, path: str) -> bool:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+
+    def read_header(self, path: str):
+        '''
+        returns header record, or None for foreign/outdated files
+        '''
+        with open(path, 'rb') as f:
+            raw = f.read(HEADER.itemsize)
+
+        if len(raw) < HEADER.itemsize:
+            return None
+
+        header = np.frombuffer(raw, dtype=HEADER)[0]
+        if header['magic'] != MAGIC.rstrip(b'\0') or header['version'] != VERSION:
+            return None
+
+        return header
+
+    def write_binary(self, tree: CSRTree, path: str, source: os.stat_result = None,
+                     kind: int = KIND_CSR) -> None:
+        '''
+        writes tree in binary format, CSR arrays or parent array
+        '''
+        if kind == KIND_CSR:
+            body = (tree.offsets.astype('<i8', copy=False), tree.neighbors.astype('<i4', copy=False))
+            header = make_header(kind, tree.N, tree.neighbors.size, source)
+        else:
+            if tree.parent is None:
+                tree.bfs()
+            body = (tree.parent.astype('<i4', copy=False),)
+            header = make_header(kind, tree.N, source=source)
+
+        def writer(f) -> None:
+            f.write(header)
+            for array in body:
+                array.tofile(f)
+
+        atomic_write(path, writer)
+
+    def write_depth_sorted(self, tree: CSRTree, path: str) -> None:
+        '''
+        writes tree as parent records sorted by depth in reverse, for streaming solvers:
+        levels from the deepest to the root, every level in BFS order, so children of a
+        vertex are contiguous and every parent record comes after the records of its children.
+        the whole tree and a few arrays of N + 1 ints are held in memory, for trees that do
+        not fit use write_depth_sorted_external on a parent file
+        '''
+        tree.ensure_bfs()
+        order, parent = tree.order, tree.parent
+
+        # parents come before their children in BFS order
+        depth = np.zeros(tree.N + 1, dtype=np.int32)
+        d, par = memoryview(depth), memoryview(parent)
+        for v in memoryview(order)[1:]:
+            d[v] = d[par[v]] + 1
+
+        order = order[np.argsort(-depth[order], kind='stable')]
+        position = np.empty(tree.N + 1, dtype=np.int32)
+        position[order] = np.arange(tree.N, dtype=np.int32)
+
+        records = np.empty(tree.N, dtype=DEPTH_RECORD)
+        records['vertex'] = order
+        records['parent'] = np.where(parent[order] > 0, position[parent[order]], -1)
+
+        def writer(f) -> None:
+            f.write(make_header(KIND_DEPTH, tree.N))
+            records.tofile(f)
+
+        atomic_write(path, writer)
+
+    def write_depth_sorted_external(self, filename: str, path: str, budget_mb: float = 64,
+                                    state_dir: str = None) -> None:
+        '''
+        write_depth_sorted for a binary parent file (KIND_PARENT, roots have parent 0) that may
+        be larger than memory, the file is read in chunks of about budget_mb of numpy
+        temporaries and the per-vertex state lives in a memory-mapped temporary file in
+        state_dir that is paged out after every chunk:
+        1) depths by pointer jumping, one chunked pass per doubling of the reach
+        2) counting sort by depth: a histogram pass, then record positions in a second pass
+        3) records written to their positions in the output file
+        the random reads of pointer jumping still map pages of the state file during a chunk,
+        those are page cache the kernel can reclaim, not process memory. within a level
+        records are in vertex order rather than BFS order, so the parents of a chunk are
+        spread over their level (ExternalDP reads the file all the same)
+        '''
+        source = self.resolve(filename)
+        header = self.read_header(source)
+        if header is None or header['kind'] != KIND_PARENT:
+            raise ValueError(f'{source} is not a parent array file')
+
+        N = int(header['N'])
+
+        chunk = max(1024, int(budget_mb * 1024 ** 2) // self.EXTERNAL_COST)
+
+        with open(source, 'rb') as src, tempfile.TemporaryFile(dir=state_dir) as state:
+            # JUMP records, position int32 and counts int64, a fresh file reads as zeros
+            state.truncate((N + 1) * 20)
+            mm = mmap.mmap(state.fileno(), 0)
+            src_mm = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+
+            self.depth_positions(src_mm, mm, N, chunk, source)
+            atomic_write(path, lambda f: self.write_records(f, src_mm, mm, N, chunk))
+
+            # the views into the maps are gone with the frames of the passes
+            mm.close()
+            src_mm.close()
+
+    def state_arrays(self, src_mm: mmap.mmap, mm: mmap.mmap, N: int) -> tuple:
+        '''
+        parent, jumps, position, counts over the maps of write_depth_sorted_external
+        '''
+        size = N + 1
+        return (
+            np.frombuffer(src_mm, dtype='<i4', count=size, offset=HEADER.itemsize),
+            np.frombuffer(mm, dtype=JUMP, count=size),
+            np.frombuffer(mm, dtype=np.int32, count=size, offset=size * 8),
+            np.frombuffer(mm, dtype=np.int64, count=size, offset=size * 12),
+        )
+
+    def depth_positions(self, src_mm: mmap.mmap, mm: mmap.mmap, N: int, chunk: int, source: str) -> None:
+        '''
+        passes 1 and 2 of write_depth_sorted_external, fills position[v] for v in 1..N
+        '''
+        parent, jumps, position, counts = self.state_arrays(src_mm, mm, N)
+        anc, depth = jumps['anc'], jumps['depth']
+        size = N + 1
+
+        # roots and the unused vertex 0 point to themselves at depth 0
+        for start in range(0, size, chunk):
+            par = parent[start:start + chunk]
+            index = np.arange(start, start + par.size)
+            if np.any((par < 0) | (par > N) | ((par == index) & (index > 0))):
+                raise ValueError(f'{source} has an invalid parent in {start}..{start + par.size - 1}')
+
+            is_root = (par == 0) | (index == 0)
+            anc[start:start + par.size] = np.where(is_root, index, par)
+            depth[start:start + par.size] = ~is_root
+            drop_pages(mm, src_mm)
+
+        # depth[v] is the distance from v to anc[v], jumping on to anc[anc[v]] keeps that
+        # true even when anc[v] was already moved earlier in the same pass
+        for _ in range(max(1, size.bit_length()) + 1):
+            moved = False
+            for start in range(0, size, chunk):
+                a = anc[start:start + chunk]
+                ahead = jumps[a]
+                if np.any(ahead['anc'] != a):
+                    moved = True
+                    depth[start:start + a.size] += ahead['depth']
+                    a[:] = ahead['anc']
+                drop_pages(mm)
+            if not moved:
+                break
+        else:
+            raise ValueError(f'{source} has a cycle')
+
+        # histogram of the depths of 1..N. a cycle can also settle with its vertices
+        # pointing to themselves, at a depth no root has
+        top = 0
+        for start in range(1, size, chunk):
+            d = depth[start:start + chunk]
+            if np.any((anc[start:start + chunk] == np.arange(start, start + d.size)) & (d > 0)):
+                raise ValueError(f'{source} has a cycle')
+
+            levels, number = np.unique(d, return_counts=True)
+            counts[levels] += number
+            top = max(top, int(levels[-1]))
+            drop_pages(mm)
+
+        # first position of every depth, deepest first
+        taken = 0
+        for end in range(top + 1, 0, -chunk):
+            block = counts[max(0, end - chunk):end][::-1]
+            first = np.cumsum(block) - block + taken
+            taken += int(block.sum())
+            block[:] = first
+            drop_pages(mm)
+
+        # positions in vertex order, stable within a depth
+        for start in range(1, size, chunk):
+            d = depth[start:start + chunk]
+            by_depth = np.argsort(d, kind='stable')
+            levels, heads, number = np.unique(d[by_depth], return_index=True, return_counts=True)
+            rank = np.arange(d.size) - np.repeat(heads, number)
+            position[start + by_depth] = np.repeat(counts[levels], number) + rank
+            counts[levels] += number
+            drop_pages(mm)
+
+    def write_records(self, f, src_mm: mmap.mmap, mm: mmap.mmap, N: int, chunk: int) -> None:
+        '''
+        pass 3 of write_depth_sorted_external, writes the depth-sorted file to f
+        '''
+        parent, _, position, _ = self.state_arrays(src_mm, mm, N)
+
+        f.write(make_header(KIND_DEPTH, N))
+        f.truncate(HEADER.itemsize + N * DEPTH_RECORD.itemsize)
+        f.flush()
+
+        out_mm = mmap.mmap(f.fileno(), 0)
+        records = np.frombuffer(out_mm, dtype=DEPTH_RECORD, count=N, offset=HEADER.itemsize)
+        for start in range(1, N + 1, chunk):
+            par = parent[start:start + chunk]
+            at = position[start:start + chunk]
+            records['vertex'][at] = np.arange(start, start + par.size)
+            records['parent'][at] = np.where(par > 0, position[par], -1)
+            drop_pages(mm, src_mm, out_mm)
+
+        del records, par, at
+        out_mm.close()
+
+    def weights_path(self, filename: str) -> str:
+        '''
+        vertex weights of a dataset are kept next to it as <filename>.w.npy, with the
+        extension, so small.txt and small.par each keep their own weights
+        '''
+        return self.resolve(filename) + '.w.npy'
+
+    def load_weights(self, filename: str, N: int = None) -> np.ndarray:
+        '''
+        memory-maps the weights of a dataset (weights[v] for v in 0..N, index 0 unused),
+        None if the dataset has none
+        '''
+        path = self.weights_path(filename)
+        if not os.path.exists(path):
+            return None
+
+        weights = np.load(path, mmap_mode='r')
+        if weights.ndim != 1 or weights.dtype.kind not in 'iuf' or (N is not None and weights.size != N + 1):
+            raise ValueError(f'{path}: expected {"N + 1" if N is None else N + 1} int or float weights')
+
+        return weights
+
+    def write_weights(self, weights: np.ndarray, filename: str) -> None:
+        '''
+        saves weights[0..N] next to the dataset filename
+        '''
+        atomic_write(self.weights_path(filename), lambda f: np.save(f, weights))
+
+    def load_binary(self, filename: str, root: int = 1) -> CSRTree:
+        '''
+        memory-maps binary dataset, CSR arrays are used zero-copy
+        '''
+        path = self.resolve(filename)
+
+        header = self.read_header(path)
+        if header is None:
+            raise ValueError(f'{path} is not a binary dataset')
+
+        N, M = int(header['N']), int(header['M'])
+        offset = HEADER.itemsize
+
+        if header['kind'] == KIND_PARENT:
+            parent = np.memmap(path, dtype='<i4', mode='r', offset=offset, shape=(N + 1,))
+            return CSRTree.from_parent(parent)
+
+        if header['kind'] == KIND_DEPTH:
+            records = np.memmap(path, dtype=DEPTH_RECORD, mode='r', offset=offset, shape=(N,))
+            vertex, index = np.asarray(records['vertex']), np.asarray(records['parent'])
+
+            parent = np.zeros(N + 1, dtype=np.int32)
+            has = index >= 0
+            parent[vertex[has]] = vertex[index[has]]
+            return CSRTree.from_parent(parent)
+
+        offsets = np.memmap(path, dtype='<i8', mode='r', offset=offset, shape=(N + 2,))
+        offset += offsets.nbytes
+        neighbors = np.memmap(path, dtype='<i4', mode='r', offset=offset, shape=(M,)) if M else np.zeros(0, dtype=np.int32)
+
+        return CSRTree(offsets, neighbors, N, root)
+
+    def load_text(self, filename: str, root: int = 1) -> CSRTree:
+        '''
+        parses adjacency file in newline-aligned chunks of a memory map,
+        line i holds the neighbors of vertex i
+        '''
+        path = self.resolve(filename)
+
+        degrees = []
+        neighbors = []
+
+        if os.path.getsize(path) > 0:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start, end in self.chunks(mm):
+                    buf = np.frombuffer(mm, dtype=np.uint8, count=end - start, offset=start)
+                    degree, values = self.parse_chunk(buf)
+                    degrees.append(degree)
+                    neighbors.append(values)
+
+                    # views into the map have to be gone before it closes
+                    del buf
+
+        N = sum(degree.size for degree in degrees)
+
+        offsets = np.zeros(N + 2, dtype=np.int64)
+        if N:
+            np.cumsum(np.concatenate(degrees), out=offsets[2:])
+
+        neighbors = np.concatenate(neighbors) if neighbors else np.zeros(0, dtype=np.int32)
+
+        return CSRTree(offsets, neighbors, N, root)
+
+    def chunks(self, mm: mmap.mmap):
+        '''
+        yields (start, end) byte ranges that end right after a newline
+        (or at end of file)
+        '''
+        size = len(mm)
+        start = 0
+
+        while start < size:
+            end = min(start + self.chunk_size, size)
+
+            if end < size:
+                cut = mm.rfind(b'\n', start, end)
+                if cut == -1:
+                    # single line longer than a chunk
+                    cut = mm.find(b'\n', end)
+                end = size if cut == -1 else cut + 1
+
+            yield start, end
+            start = end
+
+    def parse_chunk(self, buf: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        parses whole lines of space separated integers,
+        returns number of values on every line and all values in order
+        '''
+        newlines = np.flatnonzero(buf == ord('\n'))
+        lines = newlines.size
+        if buf.size and buf[-1] != ord('\n'):
+            lines += 1
+
+        # token boundaries from edges of digit runs
+        digit = ((buf >= ord('0')) & (buf <= ord('9'))).view(np.int8)
+        edges = np.diff(digit, prepend=np.int8(0), append=np.int8(0))
+        starts = np.flatnonzero(edges == 1)
+        lengths = np.flatnonzero(edges == -1) - starts
+        del digit, edges
+
+        # horner's rule, one pass per digit position
+        values = np.zeros(starts.size, dtype=np.int64)
+        for j in range(int(lengths.max()) if lengths.size else 0):
+            more = lengths > j
+            values[more] = values[more] * 10 + (buf[starts[more] + j] - ord('0'))
+
+        line_of = np.searchsorted(newlines, starts)
+        degree = np.bincount(line_of, minlength=lines).astype(np.int64)
+
+        return degree, values.astype(np.int32)
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    '''
+    Size-capped map that evicts the least recently used entry, with hit counters
+
+    get counts a lookup (and a hit if the key is there) and makes hits most recently
+    used, put stores an entry as most recently used and evicts over capacity.
+    '''
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, key):
+        '''
+        entry for key, None on a miss, hits become most recently used
+        '''
+        self.lookups += 1
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry) -> None:
+        entries = self.entries
+        entries[key] = entry
+        entries.move_to_end(key)
+
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def misses(self) -> int:
+        return self.lookups - self.hits
+
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
@@ -0,0 +1,165 @@
+import os
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+import psutil
+
+
+class Phase:
+    '''
+    timer behind Profiler.phase, a plain class rather than a generator since
+    solvers enter a few phases on every call
+    '''
+
+    __slots__ = ('phases', 'name', 'start')
+
+    def __init__(self, phases: dict, name: str):
+        self.phases = phases
+        self.name = name
+        self.start = None
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.phases[self.name] = self.phases.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class Profiler:
+    '''
+    Shared memory/time instrumentation for the solvers
+
+    traced peak : tracemalloc peak of python and numpy allocations (optional, slows python code)
+    RSS peak    : high-water mark of process RSS, sampled by a background thread
+    phases      : accumulated wall time per named phase (load, build, solve, reconstruct, ...)
+
+    With memory=False only phases are timed: no RSS reads, no sampling thread, and peak_mb()
+    and the memory fields of report() are None, nothing was measured. Solvers called without
+    a profiler run under such a private one (see session) and return None as memory usage.
+    '''
+
+    def __init__(self, trace_python: bool = False, interval: float = 0.005, memory: bool = True):
+        self.trace_python = trace_python
+        self.interval = interval
+        self.memory = memory
+
+        self.phases = {}
+        self.rss_start = 0
+        self.rss_peak = 0
+        self.traced_peak = None
+
+        self._process = None
+        self._owns_tracing = False
+        self._stop = None
+        self._sampler = None
+        self.running = False
+
+    def __enter__(self) -> 'Profiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @classmethod
+    @contextmanager
+    def session(cls, profiler: 'Profiler' = None):
+        '''
+        profiler of one solve: the given one, started for the block unless the caller
+        already runs it, or a private phase-only one (memory=False)
+        '''
+        if profiler is None:
+            profiler = cls(memory=False)
+
+        owns_profiler = not profiler.running
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            if owns_profiler:
+                profiler.stop()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+
+        if self.trace_python:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self._owns_tracing = True
+
+        if not self.memory:
+            return
+
+        self.rss_start = self.rss_peak = self.rss()
+
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+
+        if self.memory:
+            self._stop.set()
+            self._sampler.join()
+            self.rss_peak = max(self.rss_peak, self.rss())
+
+        if self.trace_python:
+            self.traced_peak = tracemalloc.get_traced_memory()[1]
+            if self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.rss_peak = max(self.rss_peak, self.rss())
+
+    def rss(self) -> int:
+        '''
+        current RSS in bytes
+        '''
+        if self._process is None:
+            self._process = psutil.Process(os.getpid())
+        return self._process.memory_info().rss
+
+    def phase(self, name: str) -> Phase:
+        '''
+        times a block, repeated phases accumulate
+        '''
+        return Phase(self.phases, name)
+
+    def peak_mb(self) -> float | None:
+        '''
+        peak memory used since start in MB, traced peak if tracing is enabled, RSS
+        high-water above the starting RSS otherwise, None if memory is not measured
+        '''
+        if self.trace_python:
+            peak = tracemalloc.get_traced_memory()[1] if self.running else self.traced_peak
+        elif not self.memory:
+            return None
+        else:
+            peak = max(self.rss_peak, self.rss() if self.running else 0) - self.rss_start
+
+        return max(peak, 0) / (1024 ** 2)   # bytes to MB
+
+    def report(self) -> dict:
+        '''
+        structured summary, times in ms and memory in MB
+        '''
+        report = {
+            'peak_mb': self.peak_mb(),
+            'rss_start_mb': self.rss_start / (1024 ** 2) if self.memory else None,
+            'rss_peak_mb': self.rss_peak / (1024 ** 2) if self.memory else None,
+            'phases_ms': {name: elapsed * 1000 for name, elapsed in self.phases.items()},
+        }
+        if self.trace_python:
+            report['traced_peak_mb'] = self.peak_mb()
+        return report
@@ -0,0 +1,250 @@
+from vertex_cover.search_graph import SearchGraph
+
+
+class DegreeBound:
+    '''
+    ceil(|E| / maxdeg): every cover vertex covers at most maxdeg edges
+    '''
+
+    def lower_bound(self, graph: SearchGraph, maxdeg: int) -> int:
+        return -(-graph.edges // maxdeg)
+
+
+class GreedyMatchingBound:
+    '''
+    size of a greedy maximal matching, every matched edge needs its own
+    cover vertex. vertices are matched in increasing order of degree,
+    which takes leaves first
+    '''
+
+    def lower_bound(self, graph: SearchGraph, maxdeg: int) -> int:
+        alive, adj = graph.alive, graph.adj
+        matched = bytearray(graph.n)
+        size = 0
+
+        for bucket in graph.buckets[1:]:
+            for v in bucket:
+                if matched[v]:
+                    continue
+                for u in adj[v]:
+                    if alive[u] and not matched[u]:
+                        matched[u] = matched[v] = 1
+                        size += 1
+                        break
+
+        return size
+
+
+class MatchingBound:
+    '''
+    size of a maximum matching, grown from a greedy one with augmenting paths.
+    exact maximum on bipartite graphs (trees, forests), where by Konig it equals
+    the minimum cover; on other graphs odd cycles can hide augmenting paths,
+    but any matching is still a valid bound
+    '''
+
+    def lower_bound(self, graph: SearchGraph, maxdeg: int) -> int:
+        alive, adj = graph.alive, graph.adj
+        mate = [-1] * graph.n
+        size = 0
+
+        for bucket in graph.buckets[1:]:
+            for v in bucket:
+                if mate[v] != -1:
+                    continue
+                for u in adj[v]:
+                    if alive[u] and mate[u] == -1:
+                        mate[u], mate[v] = v, u
+                        size += 1
+                        break
+
+        for bucket in graph.buckets[1:]:
+            for root in bucket:
+                if mate[root] == -1 and self.augment(graph, mate, root):
+                    size += 1
+
+        return size
+
+    def augment(self, graph: SearchGraph, mate: list, root: int) -> bool:
+        '''
+        alternating depth first search from free vertex root,
+        flips the path if it ends in another free vertex
+        '''
+        alive, adj = graph.alive, graph.adj
+        visited = {root}
+
+        # stack of (vertex on even position, iterator over its neighbors)
+        stack = [(root, iter(adj[root]))]
+        path = []
+
+        while stack:
+            v, neighbors = stack[-1]
+            for u in neighbors:
+                if not alive[u] or u in visited:
+                    continue
+                visited.add(u)
+
+                if mate[u] == -1:
+                    # flip v - u and every matched edge on the way back
+                    path.append((v, u))
+                    for a, b in reversed(path):
+                        mate[a], mate[b] = b, a
+                    return True
+
+                w = mate[u]
+                if w not in visited:
+                    visited.add(w)
+                    path.append((v, u))
+                    stack.append((w, iter(adj[w])))
+                    break
+            else:
+                stack.pop()
+                if path:
+                    path.pop()
+
+        return False
+
+
+class LPBound:
+    '''
+    ceil of the LP relaxation, half of a maximum matching in the bipartite
+    double cover (left copy v_L, right copy u_R for every edge uv).
+    the matching is kept between calls, pairs touching removed vertices
+    are dropped and the rest is repaired with augmenting paths
+    '''
+
+    def __init__(self):
+        self.left = None
+        self.right = None
+
+    def lower_bound(self, graph: SearchGraph, maxdeg: int) -> int:
+        alive, adj = graph.alive, graph.adj
+
+        if self.left is None or len(self.left) != graph.n:
+            self.left = [-1] * graph.n
+            self.right = [-1] * graph.n
+        left, right = self.left, self.right
+
+        size = 0
+        for v in range(graph.n):
+            u = left[v]
+            if u != -1:
+                if alive[v] and alive[u]:
+                    size += 1
+                else:
+                    left[v] = right[u] = -1
+
+        for bucket in graph.buckets[1:]:
+            for root in bucket:
+                if left[root] == -1 and self.augment(alive, adj, left, right, root):
+                    size += 1
+
+        return -(-size // 2)
+
+    def augment(self, alive, adj, left: list, right: list, root: int) -> bool:
+        '''
+        kuhn's augmenting path search from free left vertex root
+        '''
+        seen = set()
+
+        # stack of (left vertex, iterator over its neighbors on the right)
+        stack = [(root, iter(adj[root]))]
+        path = []
+
+        while stack:
+            v, neighbors = stack[-1]
+            for u in neighbors:
+                if not alive[u] or u in seen:
+                    continue
+                seen.add(u)
+
+                if right[u] == -1:
+                    path.append((v, u))
+                    for a, b in path:
+                        left[a], right[b] = b, a
+                    return True
+
+                path.append((v, u))
+                stack.append((right[u], iter(adj[right[u]])))
+                break
+            else:
+                stack.pop()
+                if path:
+                    path.pop()
+
+        return False
+
+
+class PackingBound:
+    '''
+    greedy edge packing: every alive edge takes the smaller residual weight of its
+    ends. the packed total is a feasible solution of the dual of the cover LP, so it
+    bounds every cover. with unit weights this is a greedy maximal matching
+    '''
+
+    def __init__(self, weights: list = None):
+        self.weights = weights
+
+    def lower_bound(self, graph: SearchGraph, maxdeg: int) -> int:
+        alive, adj = graph.alive, graph.adj
+        residual = list(self.weights) if self.weights is not None else [1] * graph.n
+        total = 0
+
+        # leaves first, like GreedyMatchingBound
+        for bucket in graph.buckets[1:]:
+            for v in bucket:
+                for u in adj[v]:
+                    if residual[v] <= 0:
+                        break
+                    if alive[u] and residual[u] > 0:
+                        y = min(residual[u], residual[v])
+                        residual[u] -= y
+                        residual[v] -= y
+                        total += y
+
+        return total
+
+
+class WeightedDegreeBound:
+    '''
+    weighted DegreeBound: v covers at most deg(v) of the remaining edges at cost w(v),
+    so the cheapest fractional way to cover all of them (vertices taken in increasing
+    order of w(v) / deg(v)) bounds every cover. rounded up for integer weights
+    '''
+
+    def __init__(self, weights: list):
+        self.weights = weights
+        self.integral = all(isinstance(w, int) for w in weights)
+
+    def lower_bound(self, graph: SearchGraph, maxdeg: int) -> int:
+        weights, degree = self.weights, graph.degree
+        ratios = sorted((weights[v] / degree[v], v) for d, bucket in enumerate(graph.buckets) if d
+                        for v in bucket)
+
+        need, total = graph.edges, 0
+        for _, v in ratios:
+            w, d = weights[v], degree[v]
+            if d >= need:
+                # fraction of v that covers the last edges
+                if self.integral:
+                    return total + -(-w * need // d)
+                return total + w * need / d
+            total += w
+            need -= d
+
+        return total
+
+
+BOUNDS = {
+    'degree': DegreeBound,
+    'greedy_matching': GreedyMatchingBound,
+    'matching': MatchingBound,
+    'lp': LPBound,
+    'packing': PackingBound,
+}
+
+# bounds that stay valid with vertex weights, built with the weight of every vertex index
+WEIGHTED_BOUNDS = {
+    'degree': WeightedDegreeBound,
+    'packing': PackingBound,
+}
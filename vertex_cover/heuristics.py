@@ -0,0 +1,127 @@
+import numpy as np
+
+from vertex_cover.search_graph import SearchGraph
+from vertex_cover.vc_dp import DynamicProgramming
+
+from utils.csr import CSRTree
+
+
+class CoverHeuristic:
+    '''
+    Fast covers of the alive part of a SearchGraph, used as initial upper bound
+    for branch and bound. Covers are lists of SearchGraph vertex indices, the
+    graph is left as it was found.
+
+    leaf_parent : repeatedly takes the neighbor of a degree-1 vertex, or the
+                  max-degree vertex when there is no leaf (optimal on unweighted forests)
+    matching    : both endpoints of a greedy maximal matching (2-approximation),
+                  with weights the saturated vertices of a greedy edge packing (local ratio,
+                  also a 2-approximation)
+    tree_dp     : exact tree DP, only if the alive graph is a connected tree
+
+    weights holds the weight of every vertex index, None for unit weights.
+    '''
+
+    METHODS = ('tree_dp', 'leaf_parent', 'matching')
+
+    def __init__(self, weights: list = None):
+        self.weights = weights
+
+    def cost(self, cover: list[int]) -> int:
+        if self.weights is None:
+            return len(cover)
+        return sum(self.weights[v] for v in cover)
+
+    def best(self, graph: SearchGraph) -> tuple[str, list[int]]:
+        '''
+        returns (method, cover) of the cheapest cover found by any method
+        '''
+        best = None
+        for method in self.METHODS:
+            cover = getattr(self, method)(graph)
+            if cover is not None and (best is None or self.cost(cover) < self.cost(best[1])):
+                best = (method, cover)
+
+        return best
+
+    def leaf_parent(self, graph: SearchGraph) -> list[int]:
+        cover = []
+        leaves = graph.buckets[1]
+        mark = graph.mark()
+
+        while graph.edges > 0:
+            if leaves:
+                # some neighbor has to cover the leaf edge, the parent covers more
+                v = graph.neighbors(leaves[-1])[0]
+            else:
+                v = graph.max_degree_vertex()[0]
+            graph.remove(v)
+            cover.append(v)
+
+        graph.undo(mark)
+        return cover
+
+    def matching(self, graph: SearchGraph) -> list[int]:
+        alive, adj = graph.alive, graph.adj
+
+        if self.weights is not None:
+            residual = list(self.weights)
+            for v in range(graph.n):
+                for u in adj[v]:
+                    if not alive[v] or residual[v] <= 0:
+                        break
+                    if alive[u] and residual[u] > 0:
+                        y = min(residual[u], residual[v])
+                        residual[u] -= y
+                        residual[v] -= y
+
+            # every edge has a saturated end
+            return [v for v in range(graph.n) if alive[v] and graph.degree[v] and residual[v] <= 0]
+
+        matched = bytearray(graph.n)
+        cover = []
+
+        for v in range(graph.n):
+            if not alive[v] or matched[v]:
+                continue
+            for u in adj[v]:
+                if alive[u] and not matched[u]:
+                    matched[u] = matched[v] = 1
+                    cover += (v, u)
+                    break
+
+        return cover
+
+    def tree_dp(self, graph: SearchGraph) -> list[int]:
+        '''
+        None if the alive graph is not a connected tree
+        '''
+        vertices = [v for v in range(graph.n) if graph.alive[v]]
+        if graph.edges != len(vertices) - 1:
+            return None
+
+        # with n - 1 edges, connected means acyclic
+        seen = {vertices[0]}
+        stack = [vertices[0]]
+        while stack:
+            for u in graph.neighbors(stack.pop()):
+                if u not in seen:
+                    seen.add(u)
+                    stack.append(u)
+        if len(seen) != len(vertices):
+            return None
+
+        # CSR trees are indexed 1..N
+        index = {v: i for i, v in enumerate(vertices, 1)}
+        adj = [[]] + [[index[u] for u in graph.neighbors(v)] for v in vertices]
+        tree = CSRTree.from_adjacency(adj, len(vertices))
+
+        weights = None
+        if self.weights is not None:
+            weights = np.array([0] + [self.weights[v] for v in vertices])
+
+        dp = DynamicProgramming()
+        dp.solve_iterative(tree, weights)
+        mask = dp.reconstruct()
+
+        return [vertices[i - 1] for i in mask.nonzero()[0].tolist()]
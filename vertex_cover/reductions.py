@@ -0,0 +1,110 @@
+class Reducer:
+    '''
+    Kernelization rules for minimum vertex cover, applied to a fixpoint
+
+    degree-0     : isolated vertex is never needed
+    degree-1     : take the only neighbor of a leaf
+    degree-2     : neighbors u, w of v adjacent (triangle) -> take u and w,
+                   otherwise fold v, u, w into one new vertex x with N(x) = N(u) | N(w) - {v}
+
+    Every decision is recorded in ops so a cover of the kernel can be
+    lifted back to a cover of the input graph:
+
+    ('in', u)            : u is in the cover
+    ('out', v)           : v is not in the cover
+    ('fold', x, v, u, w) : x in cover -> u and w in cover, otherwise v in cover
+    '''
+
+    def reduce(self, G) -> tuple[dict, list]:
+        '''
+        G: networkx graph or mapping from vertex to its neighbors,
+        returns kernel as dict of neighbor sets and the list of ops
+        '''
+        adj = {v: set(G[v]) - {v} for v in G}
+        ops = []
+
+        # pending vertices, leaves and isolated ones are handled before folds
+        low = [v for v in adj if len(adj[v]) <= 1]
+        two = [v for v in adj if len(adj[v]) == 2]
+        folds = 0
+
+        def remove(v):
+            for u in adj.pop(v):
+                neighbors = adj[u]
+                neighbors.discard(v)
+                if len(neighbors) <= 1:
+                    low.append(u)
+                elif len(neighbors) == 2:
+                    two.append(u)
+
+        while low or two:
+            v = low.pop() if low else two.pop()
+            if v not in adj:
+                continue
+
+            degree = len(adj[v])
+
+            if degree == 0:
+                del adj[v]
+                ops.append(('out', v))
+
+            elif degree == 1:
+                u = next(iter(adj[v]))
+                ops.append(('in', u))
+                remove(u)
+                low.append(v)
+
+            elif degree == 2:
+                u, w = adj[v]
+
+                if w in adj[u]:
+                    ops.append(('in', u))
+                    ops.append(('in', w))
+                    remove(u)
+                    remove(w)
+                    low.append(v)
+                else:
+                    x = ('fold', folds)
+                    folds += 1
+
+                    merged = (adj[u] | adj[w]) - {v}
+                    for y in (v, u, w):
+                        remove(y)
+
+                    adj[x] = merged
+                    for y in merged:
+                        adj[y].add(x)
+                    ops.append(('fold', x, v, u, w))
+
+                    if len(merged) <= 1:
+                        low.append(x)
+                    elif len(merged) == 2:
+                        two.append(x)
+
+        return adj, ops
+
+    def offset(self, ops: list) -> int:
+        '''
+        number of cover vertices decided by the reductions
+        '''
+        return sum(1 for op in ops if op[0] in ('in', 'fold'))
+
+    def lift(self, cover: set, ops: list) -> set:
+        '''
+        turns a cover of the kernel into a cover of the input graph
+        '''
+        cover = set(cover)
+
+        for op in reversed(ops):
+            if op[0] == 'in':
+                cover.add(op[1])
+            elif op[0] == 'fold':
+                x, v, u, w = op[1:]
+                if x in cover:
+                    cover.discard(x)
+                    cover.add(u)
+                    cover.add(w)
+                else:
+                    cover.add(v)
+
+        return cover
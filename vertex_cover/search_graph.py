@@ -0,0 +1,151 @@
+import random
+
+
+class SearchGraph:
+    '''
+    Residual graph for branch and bound search
+
+    Vertices are relabeled to 0..n-1 (labels[i] is the original vertex).
+    Removing a vertex clears its alive flag and decrements the degree of its
+    alive neighbors, the removal is pushed on an undo trail so backtracking
+    to an earlier mark restores the graph in O(deg) per removed vertex.
+
+    Alive vertices are kept in a bucket queue by degree (buckets[d] holds the
+    vertices of degree d, pos[v] is the index of v in its bucket), so the
+    max-degree vertex is found in O(1) amortized.
+
+    hash is a Zobrist hash (XOR of random per-vertex keys) of the alive vertices
+    with at least one alive neighbor, kept up to date by remove and undo. isolated
+    vertices are left out, so residual graphs with the same edges hash the same.
+    '''
+
+    def __init__(self, G):
+        '''
+        G: networkx graph or mapping from vertex to its neighbors
+        '''
+        self.labels = list(G)
+        index = {v: i for i, v in enumerate(self.labels)}
+
+        self.n = len(self.labels)
+        self.adj = [[index[u] for u in G[v] if u != v] for v in self.labels]
+        self.degree = [len(neighbors) for neighbors in self.adj]
+        self.alive = bytearray(b'\x01') * self.n
+        self.edges = sum(self.degree) // 2
+
+        # removed vertices, most recent last
+        self.trail = []
+
+        rng = random.Random(self.n)
+        self.keys = [rng.getrandbits(64) for _ in range(self.n)]
+        self.hash = 0
+        for v in range(self.n):
+            if self.degree[v]:
+                self.hash ^= self.keys[v]
+
+        self.top = max(self.degree, default=0)
+        self.buckets = [[] for _ in range(self.top + 1)]
+        self.pos = [0] * self.n
+        for v in range(self.n):
+            self._push(v, self.degree[v])
+
+    def _push(self, v: int, d: int) -> None:
+        bucket = self.buckets[d]
+        self.pos[v] = len(bucket)
+        bucket.append(v)
+
+    def _pop(self, v: int, d: int) -> None:
+        # swap with the last vertex of the bucket, then drop it
+        bucket, pos = self.buckets[d], self.pos
+        last = bucket.pop()
+        if last != v:
+            bucket[pos[v]] = last
+            pos[last] = pos[v]
+
+    def neighbors(self, v: int) -> list[int]:
+        '''
+        alive neighbors of v
+        '''
+        alive = self.alive
+        return [u for u in self.adj[v] if alive[u]]
+
+    def remove(self, v: int) -> None:
+        '''
+        removes alive vertex v and its edges
+        '''
+        alive, degree, keys = self.alive, self.degree, self.keys
+        push, pop = self._push, self._pop
+        h = self.hash
+
+        alive[v] = 0
+        pop(v, degree[v])
+        if degree[v]:
+            h ^= keys[v]
+
+        for u in self.adj[v]:
+            if alive[u]:
+                d = degree[u]
+                pop(u, d)
+                push(u, d - 1)
+                degree[u] = d - 1
+                if d == 1:
+                    h ^= keys[u]
+
+        # degree[v] keeps the number of edges removed with v
+        self.edges -= degree[v]
+        self.hash = h
+        self.trail.append(v)
+
+    def mark(self) -> int:
+        '''
+        current position on the undo trail
+        '''
+        return len(self.trail)
+
+    def undo(self, mark: int) -> None:
+        '''
+        restores every vertex removed after mark, in reverse order
+        '''
+        alive, degree, trail, keys = self.alive, self.degree, self.trail, self.keys
+        push, pop = self._push, self._pop
+        top, h = self.top, self.hash
+
+        while len(trail) > mark:
+            v = trail.pop()
+            alive[v] = 1
+            if degree[v]:
+                h ^= keys[v]
+
+            for u in self.adj[v]:
+                if alive[u]:
+                    d = degree[u]
+                    pop(u, d)
+                    push(u, d + 1)
+                    degree[u] = d + 1
+                    if d == 0:
+                        h ^= keys[u]
+                    if d + 1 > top:
+                        top = d + 1
+
+            push(v, degree[v])
+            if degree[v] > top:
+                top = degree[v]
+            self.edges += degree[v]
+
+        self.top, self.hash = top, h
+
+    def max_degree_vertex(self) -> tuple[int, int]:
+        '''
+        alive vertex with the highest degree, as (vertex, degree),
+        (-1, -1) if no vertex is alive
+        '''
+        buckets = self.buckets
+        top = self.top
+
+        # degrees only drop between restores, so the pointer moves down lazily
+        while top > 0 and not buckets[top]:
+            top -= 1
+        self.top = top
+
+        if not buckets[top]:
+            return -1, -1
+        return buckets[top][-1], top
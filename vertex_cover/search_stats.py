@@ -0,0 +1,50 @@
+class SearchStats:
+    '''
+    Counters of a branch and bound search
+
+    nodes        : search nodes explored (frontier entries applied)
+    prunes       : partial solutions cut off by the lower bound
+    solutions    : complete covers reached, improvements counts the ones that beat the incumbent
+    max_depth    : deepest search node, in branching decisions below the root
+    backtracks   : search nodes that had to restore removed vertices first
+    restored     : vertices restored by those backtracks (their total cost, O(deg) each)
+    bound_calls  : lower bound evaluations
+    bound_time   : seconds spent in the lower bound, estimated from the calls timed at
+                   every deadline check
+    checks       : deadline checks, one every check_interval search nodes
+    cache_*      : transposition cache lookups, hits and LRU evictions
+    '''
+
+    COUNTERS = ('nodes', 'prunes', 'solutions', 'improvements', 'backtracks', 'restored',
+                'bound_calls', 'checks', 'cache_lookups', 'cache_hits', 'cache_evictions')
+
+    def __init__(self, bound: str):
+        self.bound = bound
+        for counter in self.COUNTERS:
+            setattr(self, counter, 0)
+        self.max_depth = 0
+        self.bound_time = 0.0
+
+    def merge(self, other: 'SearchStats') -> None:
+        '''
+        adds the counters of another search (e.g. another component) to these
+        '''
+        for counter in self.COUNTERS:
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.bound_time += other.bound_time
+
+    def as_dict(self) -> dict:
+        return {
+            'bound': self.bound,
+            **{counter: getattr(self, counter) for counter in self.COUNTERS},
+            'max_depth': self.max_depth,
+            'bound_time': self.bound_time,
+            'cache_hit_rate': self.cache_hit_rate(),
+        }
+
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.cache_lookups if self.cache_lookups else 0.0
+
+    def __repr__(self) -> str:
+        return f'SearchStats({self.as_dict()})'
@@ -0,0 +1,26 @@
+from utils.lru import LRUCache
+
+
+class SubtreeMemo(LRUCache):
+    '''
+    Size-capped LRU table of rooted subtree shapes (AHU canonical form) with their DP values,
+    shared across trees and solves so every shape is solved once
+
+    A shape is identified by the sorted tuple of the canonical IDs of its child subtrees
+    (a leaf is the empty tuple), values are (ID, dp0, dp1) with unit weights. IDs come from a
+    counter and are never reused: an evicted shape seen again gets a new ID, so keys built
+    from the old one just miss and two different shapes never share an ID.
+    '''
+
+    def __init__(self, capacity: int = 1 << 20):
+        super().__init__(capacity)
+        self.next_id = 0
+
+    def add(self, key: tuple, dp0, dp1) -> int:
+        '''
+        stores a new shape, returns its ID
+        '''
+        shape_id = self.next_id
+        self.next_id += 1
+        self.put(key, (shape_id, dp0, dp1))
+        return shape_id
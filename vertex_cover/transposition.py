@@ -0,0 +1,26 @@
+from utils.lru import LRUCache
+
+
+class TranspositionCache(LRUCache):
+    '''
+    Size-capped LRU map from residual graph states to what the search proved about them
+
+    Keys are (Zobrist hash of the non-isolated alive vertices, number of alive edges), the edge
+    count makes a 64-bit hash collision between different states even less likely.
+    Values are (exact, value, cover):
+    exact=True  : value is the minimum cover size of the residual graph, cover its
+                  decisions as (vertex index, state) tuples
+    exact=False : value is a proven lower bound on the minimum cover size, cover is None
+    '''
+
+    def put_exact(self, key: tuple, value: int, cover: tuple) -> None:
+        self.put(key, (True, value, cover))
+
+    def put_bound(self, key: tuple, value: int) -> None:
+        '''
+        an exact entry or a stronger bound is never replaced by a weaker bound
+        '''
+        entry = self.entries.get(key)
+        if entry is not None and (entry[0] or entry[1] >= value):
+            return
+        self.put(key, (False, value, None))
@@ -6,17 +6,23 @@ Every vertex is considered as having one of two states: 1 or 0
 State 1  ---> Vertex is a part of Vertex Cover (VC) 
 State 0  ---> Vertex is not a part of Vertex Cover (VC) which means all its neighbors HAVE to be in VC
 
-Frontier Set: contains the set of candidate vertices for a subproblem. Each entry is a tuple list comprising of (vertex ID, state, parent in searching tree) 
+Frontier Set: contains the set of candidate vertices for a subproblem. Each entry is a tuple list comprising of (vertex ID, state, mark of parent in searching tree) 
 
-CurG        : subproblem of current graph after removing explored nodes 
+CurG        : subproblem of current graph after removing explored nodes (SearchGraph with undo trail)
 CurVC       : Current VC found in particular instance of search
 OptVC       : Best (i.e. minimum) value of |CurVC| at any given point from start
 
 Bounds to Solutions:
-Upper Bound : Initially set to number of nodes and updated to size of current solution (i.e. size of minimum vertex cover found in search)
+Upper Bound : Initially set to the smallest heuristic cover (see CoverHeuristic) and updated to size of current solution (i.e. size of minimum vertex cover found in search)
 
 Lower bound : |Current VC| + LB(CurG)
-LB(CurG)    : sum of edges in CurG / maximum node degree in CurG
+LB(CurG)    : lower bound on the cover of CurG from the strategy chosen by bound (see bounds.py)
+              degree          : ceil(edges in CurG / maximum node degree in CurG)
+              greedy_matching : size of a greedy maximal matching of CurG
+              matching        : size of a maximum matching grown with augmenting paths
+              lp              : ceil of the LP relaxation (bipartite double cover matching)
+              packing         : greedy edge packing, a dual feasible solution of the cover LP
+              with vertex weights only the weighted degree and packing bounds apply
 
 Stages of Implementation:
 1) Choose candidate node (vi)
@@ -39,186 +45,660 @@ Stages of Implementation:
 		Else, there is no better solution in this search space, so can be pruned from CurG. Backtrack to find new path.
 
 4) Backtracking
-	After reaching the end of a path, we need to backtrack to consider a new path. To do this, we have to undo the changes made to CurG and CurVC, which is where the parent item of each tuple in Frontier is handy.
+	After reaching the end of a path, we need to backtrack to consider a new path. To do this, we have to undo the changes made to CurG and CurVC, which is where the parent mark of each tuple in Frontier is handy.
 	
-	If the parent node is in the VC, then 
-		we remove the last few elements from CurVC that were added after the parent node was discovered and add the corresponing nodes+edges back to CurG. This basically 'undoes the mistakes' to CurG...
-	Else then the parent must be (-1,-1) i.e. start of the graph or root node
-		Reset CurG to G and CurVC to empty 
+	The mark is (length of CurG undo trail, length of CurVC, |CurVC|, depth) right after the parent was applied.
+	Before a Frontier entry is applied, vertices removed after the mark are restored to CurG in reverse order
+	(O(deg) each) and CurVC is cut back to the mark. The root mark (0, 0, 0, 0) resets CurG to G and CurVC to empty.
+
+5) Cutoff
+	The clock is read once every check_interval search nodes, the search stops at the first check past the deadline.
 
 When Frontier Set == empty, the whole graph and all possible solutions have been examined.
 
 End
 """
 
-import os
+import sys
 import time
-import operator
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.profiler import Profiler
+
+from vertex_cover.bounds import BOUNDS, WEIGHTED_BOUNDS
+from vertex_cover.heuristics import CoverHeuristic
+from vertex_cover.reductions import Reducer
+from vertex_cover.search_graph import SearchGraph
+from vertex_cover.search_stats import SearchStats
+from vertex_cover.transposition import TranspositionCache
+
+
+# modules of driver.py and benchmark.py imported once by the forkserver
+PRELOAD = ('networkx', 'matplotlib.pyplot')
+
+# per-process state of parallel search workers
+_worker = {}
+
+
+def init_worker(incumbent) -> None:
+    '''
+    process pool initializer, shares the best known cover size between workers
+    '''
+    _worker['incumbent'] = incumbent
+
 
-import psutil
+def pool_context():
+    '''
+    start method of the process pools: forkserver (spawn where it is missing) rather than
+    fork, a forked child inherits the locks held by threads running here at the time (the
+    profiler sampler, the anytime search) without the threads that would release them
+    '''
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+
+    # workers still re-run the imports of the main script, they fork from a server that
+    # has already done the slow ones (networkx alone is ~0.5 s per pool of 4 otherwise)
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload([__name__] + [name for name in PRELOAD if name in sys.modules])
+    return context
+
+
+def search_subproblem(solver: 'BranchAndBound', G, deadline: float, prefix: list) -> tuple[list, list, bool, SearchStats]:
+    '''
+    process pool entry point, searches the subtree below prefix
+    '''
+    return solver.search(G, deadline, prefix, _worker['incumbent'])
 
 
 class BranchAndBound:
     '''
     Branch and bound class with solver to find minimum vertex cover of tree graph
+
+    reduce      : run kernelization rules (see Reducer) to a fixpoint first,
+                  only the irreducible kernel is searched
+    decompose   : search every connected component of the kernel on its own,
+                  the cover is the union of the component covers
+    workers     : solve components on a process pool of this size, largest first
+                  (components smaller than min_parallel stay in this process)
+    split_depth : if > 0, instead split the search tree of every component with at least
+                  min_parallel vertices into subproblems at this depth and farm them out to
+                  the pool, workers prune against a shared best known cover size
+    bound       : lower bound strategy used for pruning, one of BOUNDS
+                  (degree, greedy_matching, matching, lp, packing), with weights
+                  one of WEIGHTED_BOUNDS (degree, packing)
+    warm_start  : start every search from the best heuristic cover instead of
+                  all vertices, so a cover is known before the first branch
+    check_interval : search nodes between reads of the clock for the deadline
+    sampler     : optional hook called as sampler(stats, depth) at every deadline check
+                  with the live SearchStats of the running search and the current depth
+                  (must be picklable to run on a process pool)
+    cache_size  : if > 0, remember up to this many residual graphs (LRU) with their
+                  optimal cover or a proven lower bound, so residual graphs reached again
+                  through another branching order are not searched twice
+
+    With weights passed to solve the cover of least total weight is searched, only
+    the WEIGHTED_BOUNDS (degree, packing) apply and the reductions are skipped, their
+    degree-1/2 rules assume unit weights.
+
+    solve returns the SearchStats of the whole run (also kept in stats).
+    Improved covers can be watched while the search runs, with a callback passed
+    to solve or by iterating over anytime.
     '''
-	
-    def solve(self, G, T: int) -> tuple[int, int, bool, int]:
 
-        # RECORD START TIME
-        start_time = time.perf_counter()
-        end_time = start_time
-        delta_time = end_time-start_time
-        times = []    #list of times when solution is found, tuple=(VC size,delta_time)
+    # search nodes between reads of the shared incumbent
+    SYNC_INTERVAL = 64
+
+    def __init__(self, reduce: bool = True, decompose: bool = True, workers: int = 1,
+                 min_parallel: int = 50, split_depth: int = 0, bound: str = 'degree',
+                 warm_start: bool = True, check_interval: int = 256, sampler=None,
+                 cache_size: int = 0):
+        if bound not in BOUNDS:
+            raise ValueError(f'unknown bound: {bound}')
+
+        self.reduce = reduce
+        self.decompose = decompose
+        self.workers = workers
+        self.min_parallel = min_parallel
+        self.split_depth = split_depth
+        self.bound = bound
+        self.warm_start = warm_start
+        self.check_interval = check_interval
+        self.sampler = sampler
+        self.cache_size = cache_size
+        self.stats = None
+        self.result = None
+        self.weights = None
+
+    def solve(self, G, T: int, profiler: Profiler = None, callback=None,
+              weights=None) -> tuple[list, list, bool, int, SearchStats]:
+        '''
+        returns (OptVC, times, cutoff, mem_usage, stats), mem_usage is the peak memory in MB,
+        phases and memory are recorded on profiler (without one only phases are timed and
+        mem_usage is None)
+
+        weights maps every vertex of G to its weight (dict, or list/numpy array indexed
+        by vertex), sizes in times and events are then total weights
+
+        callback is called with an event dict for every improved cover of G:
+        size, time (seconds since start), component and nodes (search nodes explored
+        in that component so far) and cover (vertices of G in the cover).
+        with a process pool, improvements are only seen when a subproblem finishes
+        '''
+        if weights is not None and self.bound not in WEIGHTED_BOUNDS:
+            raise ValueError(f'bound {self.bound} does not support weights, use one of {list(WEIGHTED_BOUNDS)}')
+
+        # plain python numbers, the search adds them up one by one
+        self.weights = weights.tolist() if hasattr(weights, 'tolist') else weights
+        reduce = self.reduce and weights is None
+
+        with Profiler.session(profiler) as profiler:
+            # RECORD START TIME
+            start_time = time.perf_counter()
+            deadline = start_time + T
+
+            reducer = Reducer()
+            with profiler.phase('reduce'):
+                kernel, ops = reducer.reduce(G) if reduce else (G, [])
+
+            # cover vertices already decided by the reductions
+            offset = reducer.offset(ops)
+
+            with profiler.phase('build'):
+                parts = self.components(kernel) if self.decompose else [kernel]
+                parts.sort(key=len, reverse=True)
+
+            # live cover size and cover of every component, for callback
+            best = [self.cost(part) for part in parts]
+            best_vc = [list(part) for part in parts]
+
+            def report(i: int, size: int, stamp: float, vc: list, nodes: int) -> None:
+                if size >= best[i]:
+                    return
+                best[i] = size
+                best_vc[i] = [node for node, state in vc if state == 1]
+
+                cover = [node for part_vc in best_vc for node in part_vc]
+                if reduce:
+                    cover = reducer.lift(cover, ops)
+                callback({
+                    'size': offset + sum(best),
+                    'time': stamp - start_time,
+                    'component': i,
+                    'nodes': nodes,
+                    'cover': list(cover),
+                })
+
+            with profiler.phase('solve'):
+                results = self.solve_parts(parts, deadline, report if callback else None)
+
+            # a component without any solution falls back to all of its vertices
+            OptVC = []
+            cutoff = False
+            events = []
+            self.stats = SearchStats(self.bound)
+            for i, (part, (part_vc, part_times, part_cutoff, part_stats)) in enumerate(zip(parts, results)):
+                OptVC += part_vc if part_times else [(node, 1) for node in part]
+                events += [(t, i, size) for size, t in part_times]
+                cutoff = cutoff or part_cutoff
+                self.stats.merge(part_stats)
+
+            # total cover size whenever some component improved, tuple=(VC size,delta_time)
+            best = [self.cost(part) for part in parts]
+            total = offset + sum(best)
+            times = []
+            for t, i, size in sorted(events):
+                total += size - best[i]
+                best[i] = size
+                times.append((total, t - start_time))  # in seconds
+
+            if reduce:
+                cover = reducer.lift({node for node, state in OptVC if state == 1}, ops)
+                OptVC = [(node, 1) for node in cover]
+
+            if not times:
+                # reductions solved everything
+                times.append((total, time.perf_counter() - start_time))
+                if callback is not None:
+                    callback({'size': total, 'time': times[-1][1], 'component': None, 'nodes': 0,
+                              'cover': [node for node, state in OptVC if state == 1]})
+
+            mem_usage = profiler.peak_mb()
+
+        return OptVC, times, cutoff, mem_usage, self.stats
+
+    def components(self, G) -> list[dict]:
+        '''
+        splits graph into connected components, each as dict of neighbor lists
+        '''
+        seen = set()
+        parts = []
+
+        for source in G:
+            if source in seen:
+                continue
+
+            seen.add(source)
+            stack = [source]
+            part = {}
+            while stack:
+                v = stack.pop()
+                part[v] = list(G[v])
+                for u in part[v]:
+                    if u not in seen:
+                        seen.add(u)
+                        stack.append(u)
+
+            parts.append(part)
+
+        return parts
+
+    def anytime(self, G, T: int, profiler: Profiler = None):
+        '''
+        generator over the improved covers of solve as they are found (see solve for
+        the events), solve runs on a background thread, its return value is kept in
+        result and stats are set once the generator is exhausted
+        '''
+        events = queue.Queue()
+        done = object()
+        error = []
+
+        def run():
+            try:
+                self.result = self.solve(G, T, profiler, events.put)
+            except BaseException as e:
+                error.append(e)
+            finally:
+                events.put(done)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+
+        while (event := events.get()) is not done:
+            yield event
+
+        thread.join()
+        if error:
+            raise error[0]
+
+    def solve_parts(self, parts: list, deadline: float, report=None) -> list[tuple[list, list, bool, SearchStats]]:
+        '''
+        searches every component, on the process pool if enabled,
+        report(component, size, stamp, OptVC, nodes) is called on improvements
+        '''
+        results = [None] * len(parts)
+        pooled = [i for i, part in enumerate(parts) if len(part) >= self.min_parallel]
+
+        def on_improve(i: int):
+            return None if report is None else (lambda *event: report(i, *event))
+
+        def finished(i: int, result: tuple) -> None:
+            # replay the final cover of a part searched in another process
+            part_vc, part_times, _, part_stats = results[i] = result
+            if report is not None and part_times:
+                report(i, *part_times[-1], part_vc, part_stats.nodes)
+
+        if self.split_depth > 0:
+            for i, part in enumerate(parts):
+                if i in pooled:
+                    results[i] = self.parallel_search(part, deadline, on_improve(i))
+                else:
+                    results[i] = self.search(part, deadline, on_improve=on_improve(i))
+
+        elif self.workers > 1 and len(pooled) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context()) as executor:
+                # parts are sorted by size, so the largest are submitted first
+                futures = {i: executor.submit(self.search, parts[i], deadline) for i in pooled}
+
+                for i, part in enumerate(parts):
+                    if i not in futures:
+                        results[i] = self.search(part, deadline, on_improve=on_improve(i))
+
+                for i, future in futures.items():
+                    finished(i, future.result())
+        else:
+            for i, part in enumerate(parts):
+                results[i] = self.search(part, deadline, on_improve=on_improve(i))
+
+        return results
+
+    def cost(self, vertices, weights: list = None) -> int:
+        '''
+        number of vertices, or their total weight when solving with weights,
+        weights are per vertex index of a SearchGraph if given, else looked up by label
+        '''
+        if self.weights is None:
+            return len(vertices)
+        if weights is None:
+            weights = self.weights
+        return sum(weights[v] for v in vertices)
+
+    def index_weights(self, CurG: SearchGraph) -> list:
+        '''
+        weight of every vertex index of CurG, None without weights
+        '''
+        if self.weights is None:
+            return None
+        return [self.weights[label] for label in CurG.labels]
+
+    def initial_cover(self, CurG: SearchGraph, weights: list = None) -> tuple[int, list]:
+        '''
+        best heuristic cover of the alive part of CurG as (cost, (vertex index, 1) tuples),
+        None if warm start is off or there is nothing to cover
+        '''
+        if not self.warm_start or CurG.edges == 0:
+            return None
+
+        cover = CoverHeuristic(weights).best(CurG)[1]
+        return self.cost(cover, weights), [(node, 1) for node in cover]
+
+    def parallel_search(self, G, deadline: float, on_improve=None) -> tuple[list, list, bool, SearchStats]:
+        '''
+        splits the search tree of G at split_depth and searches the subproblems
+        on a process pool, idle workers pull the next subproblem from the shared queue,
+        returns (OptVC, times, cutoff, stats) like search
+        '''
+        prefixes = self.split(G)
+
+        OptVC, times, cutoff = [], [], False
+        stats = SearchStats(self.bound)
+        best = self.cost(G)
+
+        # the heuristic cover is the first incumbent of every worker
+        CurG = SearchGraph(G)
+        seed = self.initial_cover(CurG, self.index_weights(CurG))
+        if seed is not None and seed[0] < best:
+            best = seed[0]
+            OptVC = [(CurG.labels[node], state) for node, state in seed[1]]
+            times.append((best, time.perf_counter()))
+            if on_improve is not None:
+                on_improve(best, times[-1][1], OptVC, 0)
+
+        context = pool_context()
+        incumbent = context.Value('i' if self.weights is None else 'd', best)
+
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=init_worker,
+                                 initargs=(incumbent,)) as executor:
+            futures = [executor.submit(search_subproblem, self, G, deadline, prefix) for prefix in prefixes]
+
+            for future in as_completed(futures):
+                part_vc, part_times, part_cutoff, part_stats = future.result()
+                cutoff = cutoff or part_cutoff
+                stats.merge(part_stats)
+                times += part_times
+                if part_times and part_times[-1][0] < best:
+                    best = part_times[-1][0]
+                    OptVC = part_vc
+                    if on_improve is not None:
+                        on_improve(best, part_times[-1][1], OptVC, stats.nodes)
+
+        # keep only improvements of the global best, in time order
+        improvements = []
+        for size, t in sorted(times, key=lambda entry: entry[1]):
+            if not improvements or size < improvements[-1][0]:
+                improvements.append((size, t))
+
+        return OptVC, improvements, cutoff, stats
+
+    def split(self, G) -> list[list]:
+        '''
+        branches on the max-degree vertex down to split_depth,
+        returns the decision prefixes (vertex index, state) in search order
+        '''
+        CurG = SearchGraph(G)
+        prefixes = []
+
+        # same order as the sequential search, state 1 is explored first
+        stack = [[]]
+        while stack:
+            prefix = stack.pop()
+            CurG.undo(0)
+            for vi, state in prefix:
+                self.apply(CurG, [], vi, state)
+
+            if len(prefix) == self.split_depth or CurG.edges == 0:
+                prefixes.append(prefix)
+                continue
+
+            vj = self.find_maxdeg(CurG)[0]
+            stack.append(prefix + [(vj, 0)])
+            stack.append(prefix + [(vj, 1)])
+
+        return prefixes
+
+    def apply(self, CurG: SearchGraph, CurVC: list, vi: int, state: int, weights: list = None) -> int:
+        '''
+        applies one branching decision, returns number of vertices
+        (or their weight, per vertex index) added to the cover
+        '''
+        added = 0
+        if state == 0:  # if vi is not selected, state of all neighbors=1
+            for node in CurG.neighbors(vi):
+                CurVC.append((node, 1))
+                CurG.remove(node)  # node is in VC, remove neighbors from CurG
+                added += 1 if weights is None else weights[node]
+        elif state == 1:  # if vi is selected, state of all neighbors=0
+            CurG.remove(vi)  # vi is in VC,remove node from G
+            added += 1 if weights is None else weights[vi]
+
+        CurVC.append((vi, state))
+        return added
+
+    def search(self, G, deadline: float, prefix: list = (), incumbent=None,
+               on_improve=None) -> tuple[list, list, bool, SearchStats]:
+        '''
+        depth first branch and bound over one graph until deadline (perf_counter),
+        returns (OptVC, times, cutoff, stats) with times as (VC size, perf_counter stamp)
+
+        prefix     : decisions (vertex index, state) applied before searching
+        incumbent  : multiprocessing.Value with the best cover size known to any worker
+        on_improve : called as on_improve(size, stamp, OptVC, nodes) on every improvement
+        '''
+        times = []    #list of times when solution is found, tuple=(VC size,time)
 
         # cutoff flag
         cutoff = False
 
-        # RECORD MEMORY USAGE
-        mem_start = self.process_memory()
-
         # INITIALIZE SOLUTION VC SETS AND FRONTIER SET TO EMPTY SET
         OptVC = []
         CurVC = []
         Frontier = []
-        neighbor = []
 
-        # ESTABLISH INITIAL UPPER BOUND
-        UpperBound = G.number_of_nodes()
-
-        CurG = G.copy()  # make a copy of G
-        # sort dictionary of degree of nodes to find node with highest degree
-        v = self.find_maxdeg(CurG)
+        CurG = SearchGraph(G)
+        weights = self.index_weights(CurG)
+        bound = BOUNDS[self.bound]() if weights is None else WEIGHTED_BOUNDS[self.bound](weights)
 
-        # APPEND (V,1,(parent,state)) and (V,0,(parent,state)) TO FRONTIER
-        Frontier.append((v[0], 0, (-1, -1)))  # tuples of node,state,(parent vertex,parent vertex state)
-        Frontier.append((v[0], 1, (-1, -1)))
+        # ESTABLISH INITIAL UPPER BOUND
+        UpperBound = self.cost(range(CurG.n), weights)
+        if incumbent is not None:
+            UpperBound = min(UpperBound, incumbent.value)
+
+        root_size = 0
+        for vi, state in prefix:
+            root_size += self.apply(CurG, CurVC, vi, state, weights)
+        root = (CurG.mark(), len(CurVC), root_size, len(prefix))
+
+        # subproblems of a split search share the incumbent seeded by parallel_search
+        seed = None if prefix else self.initial_cover(CurG, weights)
+        if seed is not None and seed[0] < UpperBound:
+            UpperBound, OptVC = seed
+            times.append((UpperBound, time.perf_counter()))
+            if on_improve is not None:
+                on_improve(UpperBound, times[-1][1], [(CurG.labels[node], state) for node, state in OptVC], 0)
+
+        if CurG.n > 0 and CurG.edges == 0:
+            # nothing to branch on, evaluate the current state as is (state -1)
+            Frontier.append((-1, -1, root))
+        elif CurG.n > 0:
+            # find node with highest degree
+            v = self.find_maxdeg(CurG)
+
+            # APPEND (V,1,mark) and (V,0,mark) TO FRONTIER
+            Frontier.append((v[0], 0, root))  # tuples of node,state,(CurG trail mark,CurVC length,|CurVC|,depth) of parent
+            Frontier.append((v[0], 1, root))
+
+        # counters live in locals and are written to stats by flush,
+        # so the loop pays no attribute access per node
+        stats = SearchStats(self.bound)
+        nodes = prunes = solutions = improvements = backtracks = restored = 0
+        bound_calls = checks = max_depth = 0
+        timed_calls, timed_time = 0, 0.0
+
+        def flush() -> None:
+            stats.nodes, stats.prunes, stats.solutions, stats.improvements = nodes, prunes, solutions, improvements
+            stats.backtracks, stats.restored, stats.max_depth = backtracks, restored, max_depth
+            stats.bound_calls, stats.checks = bound_calls, checks
+            stats.bound_time = timed_time * bound_calls / timed_calls if timed_calls else 0.0
+            if cache is not None:
+                stats.cache_lookups, stats.cache_hits, stats.cache_evictions = \
+                    cache.lookups, cache.hits, cache.evictions
+
+        check_interval, sampler = self.check_interval, self.sampler
+
+        # open search nodes as (Frontier length before their children were pushed,
+        # cache key, |CurVC|, CurVC length, number of improvements so far)
+        cache = TranspositionCache(self.cache_size) if self.cache_size > 0 else None
+        frames = []
+        trail = CurG.trail
+        next_check = 0
+        timing = False
+
+        while Frontier != []:
+            # subtrees whose entries have all been popped are fully searched
+            while frames and len(Frontier) <= frames[-1][0]:
+                self.close_frame(cache, frames.pop(), UpperBound, times, OptVC)
 
-        while Frontier != [] and delta_time < T:
             (vi, state, parent) = Frontier.pop() #set current node to last element in Frontier
+            trail_mark, vc_mark, CurVC_size, depth = parent
+            depth += 1
+
+            if nodes >= next_check:
+                # the clock is only read every check_interval nodes
+                next_check = nodes + check_interval
+                checks += 1
+                if time.perf_counter() >= deadline:
+                    '''Cutoff time reached'''
+                    cutoff = True
+                    break
+
+                # time the next bound call as a sample
+                timing = True
+                if sampler is not None:
+                    flush()
+                    sampler(stats, depth)
+
+            # backtrack to the level of parent
+            if len(trail) > trail_mark:
+                backtracks += 1
+                restored += len(trail) - trail_mark
+                CurG.undo(trail_mark)
+            del CurVC[vc_mark:]
+
+            if state >= 0:
+                CurVC_size += self.apply(CurG, CurVC, vi, state, weights)
+
+            nodes += 1
+            if depth > max_depth:
+                max_depth = depth
+            if incumbent is not None and nodes % self.SYNC_INTERVAL == 0:
+                UpperBound = min(UpperBound, incumbent.value)
+
+            found = None
+            entry = None
+            if cache is not None and CurG.edges > 0:
+                key = (CurG.hash, CurG.edges)
+                entry = cache.get(key)
+
+            if CurG.edges == 0:  # end of exploring, solution found
+                solutions += 1
+                found = CurVC
+
+            elif entry is not None and (entry[0] or CurVC_size + entry[1] >= UpperBound):
+                # residual graph was searched before, no need to do it again
+                exact, value, cover = entry
+                if exact and CurVC_size + value < UpperBound:
+                    found = CurVC + list(cover)
+                    CurVC_size += value
+                else:
+                    prunes += 1
 
-            backtrack = False
-            
-            if state == 0:  # if vi is not selected, state of all neighbors=1
-                neighbor = CurG.neighbors(vi)  # store all neighbors of vi
-                for node in list(neighbor):
-                    CurVC.append((node, 1))
-                    CurG.remove_node(node)  # node is in VC, remove neighbors from CurG
-            elif state == 1:  # if vi is selected, state of all neighbors=0
-                CurG.remove_node(vi)  # vi is in VC,remove node from G
-
-            else:
-                pass
-
-            CurVC.append((vi, state))
-            CurVC_size = self.vc_size(CurVC)
-
-            if CurG.number_of_edges() == 0:  # end of exploring, solution found
-
-                if CurVC_size < UpperBound:
-                    OptVC = CurVC.copy()
-                    UpperBound = CurVC_size
-                    times.append((CurVC_size, time.perf_counter() - start_time))  # in seconds
-                
-                backtrack = True
-                    
             else:   # partial solution
-                CurLB = self.lowerbound(CurG) + CurVC_size
+                vj = self.find_maxdeg(CurG)
+
+                bound_calls += 1
+                if timing:
+                    bound_start = time.perf_counter()
+                    CurLB = bound.lower_bound(CurG, vj[1]) + CurVC_size
+                    timed_time += time.perf_counter() - bound_start
+                    timed_calls += 1
+                    timing = False
+                else:
+                    CurLB = bound.lower_bound(CurG, vj[1]) + CurVC_size
 
                 if CurLB < UpperBound:  # worth exploring
-                    vj = self.find_maxdeg(CurG)
-                    Frontier.append((vj[0], 0, (vi, state))) # (vi, state) is parent of vj
-                    Frontier.append((vj[0], 1, (vi, state)))
+                    if cache is not None:
+                        # closed once both children and everything below them are explored
+                        frames.append((len(Frontier), key, CurVC_size, len(CurVC), len(times)))
 
+                    mark = (CurG.mark(), len(CurVC), CurVC_size, depth)
+                    Frontier.append((vj[0], 0, mark)) # (vi, state) is parent of vj
+                    Frontier.append((vj[0], 1, mark))
                 else:
-                    # end of path, will result in worse solution,backtrack to parent
-                    backtrack=True
-
-
-            if backtrack==True:
-
-                if Frontier != []:	#otherwise no more candidates to process
-                    nextnode_parent = Frontier[-1][2]	#parent of last element in Frontier (tuple of (vertex, state))
-
-                    # backtrack to the level of nextnode_parent
-                    if nextnode_parent in CurVC:
-                        
-                        id = CurVC.index(nextnode_parent) + 1
-                        while id < len(CurVC):	# undo changes from end of CurVC back up to parent node
-                            mynode, mystate = CurVC.pop()	# undo the addition to CurVC
-                            CurG.add_node(mynode)	# undo the deletion from CurG
-                            
-                            # find all the edges connected to vi in Graph G
-                            # or the edges that connected to the nodes that not in current VC set.
-                            
-                            curVC_nodes = list(map(lambda t:t[0], CurVC))
-                            for nd in G.neighbors(mynode):
-                                if (nd in CurG.nodes()) and (nd not in curVC_nodes):
-                                    CurG.add_edge(nd, mynode)	#this adds edges of vi back to CurG that were possibly deleted
-
-                    elif nextnode_parent == (-1, -1):
-                        # backtrack to the root node
-                        CurVC.clear()
-                        CurG = G.copy()
-                    else:
-                        print('Error: error in backtracking step')
-                    
-            end_time = time.perf_counter()
-            delta_time = end_time - start_time  # in seconds.
-            
-            if delta_time > T:
-                '''Cutoff time reached'''
-                cutoff = True
-        
-        mem_end = self.process_memory()
-        mem_usage = mem_end - mem_start
-
-        return OptVC, times, cutoff, mem_usage
+                    # end of path, will result in worse solution,
+                    # next Frontier entry backtracks to its parent
+                    prunes += 1
+
+            if found is not None and CurVC_size < UpperBound:
+                improvements += 1
+                OptVC = list(found)
+                UpperBound = CurVC_size
+                times.append((CurVC_size, time.perf_counter()))
+                if on_improve is not None:
+                    on_improve(CurVC_size, times[-1][1],
+                               [(CurG.labels[node], state) for node, state in OptVC], nodes)
+
+                if incumbent is not None:
+                    with incumbent.get_lock():
+                        if CurVC_size < incumbent.value:
+                            incumbent.value = CurVC_size
+
+        OptVC = [(CurG.labels[node], state) for node, state in OptVC]
+        flush()
+
+        return OptVC, times, cutoff, stats
     
 
-    def find_maxdeg(self, g):
+    def close_frame(self, cache: TranspositionCache, frame: tuple, UpperBound: int,
+                    times: list, OptVC: list) -> None:
         '''
-        finds the vertex with max number of degree in remaining graph
+        caches what the search below a finished node proved about its residual graph
         '''
-        deglist = g.degree()
-        # deglist_sorted = sorted(deglist, reverse=True, key=operator.itemgetter(1))  # sort in descending order of node degree
-        # v = deglist_sorted[0]  # tuple - (node,degree)
-        maxdeg = max(deglist, key=operator.itemgetter(1))
-        # return v
-        return maxdeg
+        _, key, size, vc_len, improvements = frame
+        if len(times) > improvements and times[-1][0] == UpperBound:
+            # the best cover so far was found below this node, so it is optimal there
+            cache.put_exact(key, UpperBound - size, tuple(OptVC[vc_len:]))
+        else:
+            # nothing below this node beats the upper bound
+            cache.put_bound(key, UpperBound - size)
 
-    def lowerbound(self, graph):
-        '''
-        estimates lowerbound
+    def find_maxdeg(self, g: SearchGraph) -> tuple[int, int]:
         '''
-        lb = graph.number_of_edges() / self.find_maxdeg(graph)[1]
-        lb = self.ceil(lb)
-        return lb
-
-    def ceil(self, d: int) -> int:
+        finds the vertex with max number of degree in remaining graph
         '''
-        return the minimum integer that is bigger than d
-        ''' 
-        if d > int(d):
-            return int(d) + 1
-        else:
-            return int(d)
+        return g.max_degree_vertex()
 
-    def vc_size(self, VC: list) -> int:
+    def vc_size(self, VC: list, weights=None) -> int:
         '''
         Calculate size of vertex cover (number of nodes with state = 1)
         VC  : a tuple list, where each tuple = (node_ID, state, (node_ID, state)) vc_size is the number of nodes which has state == 1
+        weights : if given, the total weight of those nodes instead (weights[node_ID])
         '''
         vc_size = 0
         for element in VC:
-            vc_size = vc_size + element[1]
+            if weights is None:
+                vc_size = vc_size + element[1]
+            elif element[1] == 1:
+                vc_size = vc_size + weights[element[0]]
         return vc_size
-    
-    def process_memory(self) -> int:
-        '''
-        evaluates memory usage in MB
-        '''
-
-        process = psutil.Process(os.getpid())
-        mem_info = process.memory_info()
-        return mem_info.rss / (1024 ** 2)   # bytes to MB
\ No newline at end of file
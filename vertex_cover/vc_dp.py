@@ -1,15 +1,252 @@
 import os
 
-import psutil
+import numpy as np
+
+from utils.csr import CSRTree
+from utils.profiler import Profiler
+
+from vertex_cover.subtree_memo import SubtreeMemo
 
 
 class DynamicProgramming:
     '''
     Dynamic programming class with solver to find minimum vertex cover of tree graph
+
+    Modes:
+    iterative : post-order over flat CSR arrays, no recursion (default)
+    vectorized: one numpy scatter-reduction per depth level, fastest on
+                bushy trees, but pays a fixed cost per level on deep ones
+    recursive : original recursive dfs over adjacency list
+
+    Every solver takes optional vertex weights (numpy array indexed like the vertices,
+    int or float) and then minimizes the total weight of the cover instead of its size.
+
+    solve_forced adds a downward (rerooting) pass after the bottom-up one and gives, for
+    every vertex, the minimum cover size with that vertex forced into or out of the cover,
+    O(N) for all vertices, answered by forced_size in O(1).
+
+    solve_memoized and solve_batch_memoized (unit weights, opt-in) give every rooted subtree
+    its AHU canonical ID bottom-up and take the DP values of shapes seen before, in this tree
+    or in earlier ones, from a SubtreeMemo, which keeps the hits and misses. They are slower
+    than the plain passes on these trees (building a key visits every vertex in python, a hit
+    only saves two additions), their use is the shape IDs and reuse across calls.
     '''
 
-    def solve(self, adj: list[list[int]], N: int) -> tuple[int, int]:
-        mem_start = self.process_memory()
+    MODES = ('iterative', 'vectorized', 'recursive')
+
+    def __init__(self):
+        # state of the last array-backed solve, kept for cover reconstruction
+        self.tree = None
+        self.dp0 = None
+        self.dp1 = None
+        self.forced_in = None
+        self.forced_out = None
+        self.memo = None
+        self.profiler = None
+
+    def solve(self, adj, N: int, mode: str = 'iterative', profiler: Profiler = None,
+              weights: np.ndarray = None) -> tuple[int, int]:
+        '''
+        returns minimum vertex cover size (weight if weights[0..N] are given) and peak
+        memory usage in MB, phases and memory are recorded on profiler (without one only
+        phases are timed, on a private profiler, and the memory usage is None)
+        '''
+        if mode not in self.MODES:
+            raise ValueError(f'unknown mode: {mode}')
+
+        with Profiler.session(profiler) as profiler:
+            self.profiler = profiler
+            self.tree = self.dp0 = self.dp1 = None
+
+            if mode == 'recursive':
+                if isinstance(adj, CSRTree):
+                    with profiler.phase('build'):
+                        adj = adj.adjacency()
+                with profiler.phase('solve'):
+                    vc = self.solve_recursive(adj, N, weights)
+            else:
+                with profiler.phase('build'):
+                    tree = adj if isinstance(adj, CSRTree) else CSRTree.from_adjacency(adj, N)
+
+                with profiler.phase('order'):
+                    if mode == 'vectorized':
+                        tree.ensure_levels()
+                    else:
+                        tree.ensure_bfs()
+
+                with profiler.phase('solve'):
+                    if mode == 'vectorized':
+                        vc = self.solve_vectorized(tree, weights)
+                    else:
+                        vc = self.solve_iterative(tree, weights)
+
+            mem_usage = profiler.peak_mb()
+
+        # return minimum size vertex cover
+        return vc, mem_usage
+
+    def solve_forced(self, adj, N: int, mode: str = 'iterative', profiler: Profiler = None,
+                     weights: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        returns (forced_in, forced_out): forced_in[v] / forced_out[v] is the minimum vertex
+        cover size (weight) with v in / out of the cover, for v in 1..N (iterative or vectorized)
+        '''
+        if mode not in ('iterative', 'vectorized'):
+            raise ValueError(f'forced covers need an iterative or vectorized mode, got {mode}')
+
+        with Profiler.session(profiler) as profiler:
+            self.solve(adj, N, mode, profiler, weights)
+
+            with profiler.phase('reroot'):
+                if mode == 'vectorized':
+                    up0, up1 = self.reroot_vectorized()
+                else:
+                    up0, up1 = self.reroot_iterative()
+
+                dp0, dp1 = self.dp0, self.dp1
+                self.forced_in = dp1 + np.minimum(up0, up1)
+                self.forced_out = dp0 + up1
+                self.forced_in[0] = self.forced_out[0] = 0
+
+        return self.forced_in, self.forced_out
+
+    def reroot_iterative(self) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        top-down pass in BFS order over the last solve. For a vertex v with parent p,
+        up0[v] / up1[v] is the minimum cover of the tree outside the subtree of v with p
+        out / in of the cover (0 for the root):
+            up0[v] = dp0[p] - dp1[v] + up1[p]
+            up1[v] = dp1[p] - min(dp0[v], dp1[v]) + min(up0[p], up1[p])
+        '''
+        tree, dp0, dp1 = self.tree, self.dp0, self.dp1
+        up0, up1 = np.zeros_like(dp0), np.zeros_like(dp1)
+
+        d0, d1 = memoryview(dp0), memoryview(dp1)
+        u0, u1 = memoryview(up0), memoryview(up1)
+        par = memoryview(tree.parent)
+
+        for v in memoryview(tree.order)[1:]:
+            p = par[v]
+            inc, exc = d1[v], d0[v]
+            a, b = u0[p], u1[p]
+            u0[v] = d0[p] - inc + b
+            u1[v] = d1[p] - (inc if inc < exc else exc) + (a if a < b else b)
+
+        return up0, up1
+
+    def reroot_vectorized(self) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        reroot_iterative one depth level at a time
+        '''
+        tree, dp0, dp1 = self.tree, self.dp0, self.dp1
+        up0, up1 = np.zeros_like(dp0), np.zeros_like(dp1)
+        order, parent, levels = tree.order, tree.parent, tree.levels
+
+        for k in range(1, len(levels) - 1):
+            child = order[levels[k]:levels[k + 1]]
+            par = parent[child]
+            inc = dp1[child]
+            up0[child] = dp0[par] - inc + up1[par]
+            up1[child] = dp1[par] - np.minimum(dp0[child], inc) + np.minimum(up0[par], up1[par])
+
+        return up0, up1
+
+    def forced_size(self, v: int, state: int):
+        '''
+        minimum cover size (weight) with v in (state 1) or out (state 0) of the cover,
+        needs solve_forced first
+        '''
+        if self.forced_in is None:
+            raise ValueError('forced cover queries need solve_forced first')
+        return (self.forced_in if state else self.forced_out)[v].item()
+
+    def solve_memoized(self, tree: CSRTree, memo: SubtreeMemo = None, profiler: Profiler = None) -> int:
+        '''
+        minimum vertex cover size of tree, subtrees of a shape already in memo (a private
+        one if not given) are not solved again, cover() works as after solve_iterative
+        '''
+        with Profiler.session(profiler) as profiler:
+            self.profiler = profiler
+
+            with profiler.phase('order'):
+                tree.ensure_bfs()
+
+            with profiler.phase('solve'):
+                self.memo = memo if memo is not None else SubtreeMemo()
+                dp0, dp1 = self.memoized(tree.order[::-1], tree.parent, tree.order[1:], tree.N + 1)
+
+        self.tree, self.dp0, self.dp1 = tree, dp0, dp1
+
+        root = tree.root
+        return min(dp0[root], dp1[root]).item()
+
+    def solve_batch_memoized(self, parent: np.ndarray, memo: SubtreeMemo = None,
+                             profiler: Profiler = None) -> np.ndarray:
+        '''
+        solve_batch through memo (a private one if not given), repeated shapes across all
+        trees of the forest, and across earlier calls sharing memo, are solved once
+        '''
+        with Profiler.session(profiler) as profiler:
+            with profiler.phase('order'):
+                # deepest first, every child before its parent
+                order = np.argsort(-self.forest_depth(parent), kind='stable')
+
+            with profiler.phase('solve'):
+                self.memo = memo if memo is not None else SubtreeMemo()
+                dp0, dp1 = self.memoized(order, parent, np.flatnonzero(parent >= 0), parent.size)
+
+                roots = np.flatnonzero(parent < 0)
+                sizes = np.minimum(dp0[roots], dp1[roots])
+
+        return sizes
+
+    def memoized(self, order: np.ndarray, parent: np.ndarray, children: np.ndarray,
+                 size: int) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        bottom-up pass behind solve_memoized, order has every child before its parent
+        and children lists the vertices that have a parent
+        '''
+        # children of v are kids[start[v]:start[v + 1]]
+        par = parent[children]
+        kids = children[np.argsort(par, kind='stable')].tolist()
+        start = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(par, minlength=size), out=start[1:])
+
+        memo = self.memo
+        ids, d0, d1 = (np.zeros(size, dtype=np.int64) for _ in range(3))
+
+        # all leaves share the empty shape, they are resolved by one lookup and
+        # counted as one, so the hit rate is over the lookups actually made
+        is_leaf = (start[order + 1] == start[order])
+        leaves = order[is_leaf]
+        if leaves.size:
+            entry = memo.get(())
+            if entry is None:
+                entry = (memo.add((), 0, 1), 0, 1)
+            ids[leaves], d1[leaves] = entry[0], 1
+
+        ids, d0, d1 = ids.tolist(), d0.tolist(), d1.tolist()
+
+        starts = start.tolist()
+        for v in order[~is_leaf].tolist():
+            block = kids[starts[v]:starts[v + 1]]
+            key = tuple(sorted([ids[c] for c in block]))
+
+            entry = memo.get(key)
+            if entry is None:
+                exc, inc = 0, 1
+                for c in block:
+                    a, b = d1[c], d0[c]
+                    exc += a
+                    inc += a if a < b else b
+                entry = (memo.add(key, exc, inc), exc, inc)
+
+            ids[v], d0[v], d1[v] = entry
+
+        return np.array(d0, dtype=np.int64), np.array(d1, dtype=np.int64)
+
+    def solve_recursive(self, adj: list[list[int]], N: int, weights: np.ndarray = None) -> int:
+        cost = [1] * (N + 1) if weights is None else self.initial(N + 1, weights)[1].tolist()
 
         dp = [[0 for j in range(2)] for i in range(N+1)]
         for i in range(1, N+1):
@@ -17,16 +254,206 @@ class DynamicProgramming:
             dp[i][0] = 0
     
             # 1 denotes included in vertex cover
-            dp[i][1] = 1
+            dp[i][1] = cost[i]
     
         self.dfs(adj, dp, 1, -1)
 
-        mem_end = self.process_memory()
-        mem_usage = mem_end - mem_start
+        return min(dp[1][0], dp[1][1])
 
-        # return minimum size vertex cover
-        return min(dp[1][0], dp[1][1]), mem_usage
+    def solve_iterative(self, tree: CSRTree, weights: np.ndarray = None) -> int:
+        '''
+        bottom-up pass in reverse BFS order, every child is
+        finished before its parent is read
+        '''
+        tree.ensure_bfs()
+
+        # 0 denotes not included in vertex cover, 1 denotes included
+        dp0, dp1 = self.initial(tree.N + 1, weights)
+        dp1[0] = 0
+
+        d0, d1 = memoryview(dp0), memoryview(dp1)
+        par = memoryview(tree.parent)
+
+        for v in memoryview(tree.order)[::-1]:
+            p = par[v]
+            if p:
+                inc, exc = d1[v], d0[v]
+                d0[p] += inc
+                d1[p] += inc if inc < exc else exc
+
+        self.tree, self.dp0, self.dp1 = tree, dp0, dp1
+
+        root = tree.root
+        return min(dp0[root], dp1[root]).item()
+
+    def solve_vectorized(self, tree: CSRTree, weights: np.ndarray = None) -> int:
+        '''
+        bottom-up pass one depth level at a time, children of the same
+        parent are contiguous in a level so their contributions are
+        summed with a segmented reduction
+        '''
+        tree.ensure_levels()
+
+        dp0, dp1 = self.initial(tree.N + 1, weights)
+        dp1[0] = 0
+
+        order, parent, levels = tree.order, tree.parent, tree.levels
+
+        for k in range(len(levels) - 2, 0, -1):
+            child = order[levels[k]:levels[k + 1]]
+            self.reduce_level(dp0, dp1, child, parent[child])
+
+        self.tree, self.dp0, self.dp1 = tree, dp0, dp1
+
+        root = tree.root
+        return min(dp0[root], dp1[root]).item()
+
+    def initial(self, size: int, weights: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        dp0 and dp1 of leaves: int32 unit costs, or an int64/float64 copy of weights
+        '''
+        if weights is None:
+            dp1 = np.ones(size, dtype=np.int32)
+        else:
+            weights = np.asarray(weights)
+            if weights.shape != (size,):
+                raise ValueError(f'expected {size} weights, got shape {weights.shape}')
+            dp1 = weights.astype(np.float64 if weights.dtype.kind == 'f' else np.int64)
+
+        return np.zeros(size, dtype=dp1.dtype), dp1
+
+    def reduce_level(self, dp0: np.ndarray, dp1: np.ndarray, child: np.ndarray, par: np.ndarray) -> None:
+        '''
+        adds finished children to their parents, children of the same parent must be contiguous
+        '''
+        # first child of every parent within this level
+        heads = np.flatnonzero(np.r_[True, par[1:] != par[:-1]])
+        targets = par[heads]
+
+        inc = dp1[child]
+        dp0[targets] += np.add.reduceat(inc, heads)
+        dp1[targets] += np.add.reduceat(np.minimum(dp0[child], inc), heads)
+
+    def solve_batch(self, parent: np.ndarray, profiler: Profiler = None, weights: np.ndarray = None) -> np.ndarray:
+        '''
+        minimum vertex cover size of every tree of a forest in one vectorized pass,
+        parent[v] is the parent of vertex v (0..M-1), -1 for roots.
+        returns an array with one size (weight if weights[0..M-1] are given) per tree,
+        in increasing order of the roots
+
+        levels are formed over the whole forest, so the number of numpy steps is the
+        depth of the deepest tree, not the number of trees
+        '''
+        with Profiler.session(profiler) as profiler:
+            with profiler.phase('order'):
+                depth = self.forest_depth(parent)
+
+                # deepest level first, children of the same parent next to each other
+                order = np.lexsort((parent, -depth))
+                levels = np.flatnonzero(np.diff(depth[order])) + 1
+
+            with profiler.phase('solve'):
+                dp0, dp1 = self.initial(parent.size, weights)
+
+                # the last level holds the roots
+                bounds = np.r_[0, levels]
+                for start, end in zip(bounds[:-1], bounds[1:]):
+                    child = order[start:end]
+                    self.reduce_level(dp0, dp1, child, parent[child])
+
+                roots = np.flatnonzero(parent < 0)
+                sizes = np.minimum(dp0[roots], dp1[roots])
+
+        return sizes
+
+    def solve_batch_csr(self, offsets: np.ndarray, neighbors: np.ndarray, tree_offsets: np.ndarray,
+                        profiler: Profiler = None, weights: np.ndarray = None) -> np.ndarray:
+        '''
+        solve_batch for a forest as one CSR on vertices 0..M-1 (neighbors of v are
+        neighbors[offsets[v]:offsets[v + 1]]), tree i is made of the vertices
+        tree_offsets[i]..tree_offsets[i + 1] - 1 and rooted at the first of them.
+        returns one cover size per tree
+        '''
+        with Profiler.session(profiler) as profiler:
+            with profiler.phase('build'):
+                parent = CSRTree.forest_parent(offsets, neighbors, tree_offsets[:-1])
+
+            return self.solve_batch(parent, profiler, weights)
+
+    def forest_depth(self, parent: np.ndarray) -> np.ndarray:
+        '''
+        depth of every vertex of a parent array (-1 for roots) by pointer jumping,
+        O(M log depth)
+        '''
+        idx = np.arange(parent.size)
+        is_root = parent < 0
+
+        # ancestor pointers double their reach every round, roots point to themselves
+        anc = np.where(is_root, idx, parent)
+        depth = (~is_root).astype(np.int32)
+
+        for _ in range(max(1, parent.size.bit_length()) + 1):
+            if is_root[anc].all():
+                return depth
+            depth += depth[anc]
+            anc = anc[anc]
+
+        raise ValueError('parent array has a cycle')
     
+    def cover(self) -> np.ndarray:
+        '''
+        traces the choices of the last solve back top-down,
+        returns boolean mask where mask[v] is True if v is in the cover
+        '''
+        if self.tree is None:
+            raise ValueError('cover reconstruction needs an iterative or vectorized solve first')
+
+        with self.profiler.phase('reconstruct'):
+            return self.reconstruct()
+
+    def reconstruct(self) -> np.ndarray:
+        '''
+        top-down pass behind cover()
+        '''
+        tree, dp0, dp1 = self.tree, self.dp0, self.dp1
+        order, parent = tree.order, tree.parent
+
+        mask = np.zeros(tree.N + 1, dtype=np.bool_)
+        root = tree.root
+        mask[root] = dp1[root] <= dp0[root]
+
+        if tree.levels is not None:
+            levels = tree.levels
+            for k in range(1, len(levels) - 1):
+                child = order[levels[k]:levels[k + 1]]
+
+                # excluded parent forces the child in, otherwise take the cheaper state
+                mask[child] = ~mask[parent[child]] | (dp1[child] < dp0[child])
+        else:
+            d0, d1 = memoryview(dp0), memoryview(dp1)
+            par, m = memoryview(parent), memoryview(mask)
+            for v in memoryview(order)[1:]:
+                m[v] = not m[par[v]] or d1[v] < d0[v]
+
+        return mask
+
+    def export_cover(self, mask: np.ndarray, filename: str, chunk_size: int = 1 << 20) -> None:
+        '''
+        streams cover mask to a packed bitmap file, bit v is set if v is in the cover
+        '''
+        chunk_size -= chunk_size % 8
+
+        with open(os.path.join(os.getcwd(), 'output', filename), "wb") as f:
+            for start in range(0, mask.size, chunk_size):
+                f.write(np.packbits(mask[start:start + chunk_size], bitorder='little').tobytes())
+
+    def import_cover(self, filename: str, N: int) -> np.ndarray:
+        '''
+        reads a packed bitmap written by export_cover back into a boolean mask
+        '''
+        bits = np.fromfile(os.path.join(os.getcwd(), 'output', filename), dtype=np.uint8)
+        return np.unpackbits(bits, count=N + 1, bitorder='little').astype(np.bool_)
+
     def dfs(self, adj: list[list[int]], dp: list[list[int]], src: int, par: int) -> None:
         for child in adj[src]:
             if child != par:
@@ -39,12 +466,3 @@ class DynamicProgramming:
     
                 # including source in the vertex cover
                 dp[src][1] = dp[src][1] + min(dp[child][1], dp[child][0])
-    
-    def process_memory(self) -> int:
-        '''
-        evaluates memory usage in MB
-        '''
-
-        process = psutil.Process(os.getpid())
-        mem_info = process.memory_info()
-        return mem_info.rss / (1024 ** 2)   # bytes to MB
\ No newline at end of file
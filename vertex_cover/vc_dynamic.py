@@ -0,0 +1,165 @@
+import numpy as np
+
+from utils.csr import CSRTree
+from vertex_cover.vc_dp import DynamicProgramming
+
+
+class DynamicTreeDP:
+    '''
+    Tree DP kept alive between changes of the tree: leaves can be attached and removed,
+    subtrees cut off and linked back, and only the states on the path to the root are
+    updated, instead of solving all N vertices again
+
+    The forest is held as parent pointers (0 for roots) with dp0[v] / dp1[v] as in
+    DynamicProgramming, vertices are 1..N after build and new leaves get the next ids.
+    A child v contributes dp1[v] to dp0 of its parent and min(dp0[v], dp1[v]) to dp1 of it,
+    so a change below p is passed up as the change of those two values. The walk stops at
+    the first ancestor whose contributions do not change, which on random trees is a few
+    levels up. The worst case is the depth of the tree (a long path), and link also walks
+    from the new parent to its root to rule out a cycle.
+
+    total is the minimum cover size (weight) of the whole forest, touched the number of
+    vertices updated by the last change.
+    '''
+
+    def __init__(self):
+        self.parent = None
+        self.dp0 = None
+        self.dp1 = None
+        self.children = None
+        self.alive = None
+        self.total = 0
+        self.touched = 0
+
+    def build(self, tree: CSRTree, weights: np.ndarray = None) -> int:
+        '''
+        full solve of tree, returns its minimum vertex cover size (weight with weights[0..N])
+        '''
+        dp = DynamicProgramming()
+        self.total = dp.solve_iterative(tree, weights)
+
+        # plain lists, every update touches a handful of single elements
+        self.parent = tree.parent.tolist()
+        self.dp0, self.dp1 = dp.dp0.tolist(), dp.dp1.tolist()
+
+        children = np.bincount(tree.parent[1:], minlength=tree.N + 1)
+        children[0] = 0
+        self.children = children.tolist()
+
+        self.alive = bytearray(b'\x01') * (tree.N + 1)
+        self.alive[0] = 0
+        self.touched = tree.N
+        return self.total
+
+    def add_leaf(self, p: int, weight=1) -> int:
+        '''
+        attaches a new leaf of the given weight below p, returns its id
+        '''
+        self.check(p)
+        v = len(self.parent)
+        self.parent.append(p)
+        self.dp0.append(0)
+        self.dp1.append(weight)
+        self.children.append(0)
+        self.alive.append(1)
+
+        self.children[p] += 1
+        self.update(p, weight, min(0, weight))
+        return v
+
+    def remove_leaf(self, v: int) -> None:
+        '''
+        deletes leaf v, its id is not reused
+        '''
+        self.check(v)
+        if self.children[v]:
+            raise ValueError(f'vertex {v} is not a leaf')
+
+        if self.parent[v]:
+            self.detach(v)
+        else:
+            self.total -= min(self.dp0[v], self.dp1[v])
+            self.touched = 0
+        self.alive[v] = 0
+
+    def cut(self, v: int) -> None:
+        '''
+        detaches the subtree of v from its parent, v becomes the root of a tree of its own
+        '''
+        self.check(v)
+        if not self.parent[v]:
+            raise ValueError(f'vertex {v} is a root')
+
+        self.detach(v)
+        self.total += min(self.dp0[v], self.dp1[v])
+
+    def link(self, v: int, p: int) -> None:
+        '''
+        attaches the tree rooted at v below p, p must be in another tree
+        '''
+        self.check(v)
+        self.check(p)
+        if self.parent[v]:
+            raise ValueError(f'vertex {v} is not a root')
+        if self.root(p) == v:
+            raise ValueError(f'vertex {p} is in the tree of {v}')
+
+        d0, d1 = self.dp0[v], self.dp1[v]
+        self.total -= min(d0, d1)
+        self.parent[v] = p
+        self.children[p] += 1
+        self.update(p, d1, min(d0, d1))
+
+    def size(self, v: int = None):
+        '''
+        minimum cover size (weight) of the tree containing v, of the whole forest if v is None
+        '''
+        if v is None:
+            return self.total
+        self.check(v)
+        r = self.root(v)
+        return min(self.dp0[r], self.dp1[r])
+
+    def root(self, v: int) -> int:
+        parent = self.parent
+        while parent[v]:
+            v = parent[v]
+        return v
+
+    def check(self, v: int) -> None:
+        if not (0 < v < len(self.alive) and self.alive[v]):
+            raise ValueError(f'no vertex {v}')
+
+    def detach(self, v: int) -> None:
+        '''
+        takes the contribution of v away from its parent
+        '''
+        p = self.parent[v]
+        d0, d1 = self.dp0[v], self.dp1[v]
+        self.parent[v] = 0
+        self.children[p] -= 1
+        self.update(p, -d1, -min(d0, d1))
+
+    def update(self, p: int, d0, d1) -> None:
+        '''
+        adds d0 to dp0[p] and d1 to dp1[p], then passes the change up the root path
+        until the contributions of a vertex to its parent stay the same
+        '''
+        parent, dp0, dp1 = self.parent, self.dp0, self.dp1
+        touched = 0
+
+        while d0 or d1:
+            old0, old1 = dp0[p], dp1[p]
+            new0, new1 = old0 + d0, old1 + d1
+            dp0[p], dp1[p] = new0, new1
+            touched += 1
+
+            q = parent[p]
+            if not q:
+                self.total += min(new0, new1) - min(old0, old1)
+                break
+
+            d0, d1 = new1 - old1, min(new0, new1) - min(old0, old1)
+            p = q
+
+        self.touched = touched
@@ -0,0 +1,155 @@
+import os
+import mmap
+import time
+import tempfile
+
+import numpy as np
+
+from utils.loader import DatasetLoader, DEPTH_RECORD, HEADER, KIND_DEPTH, drop_pages
+from utils.profiler import Profiler
+
+
+class ExternalDP:
+    '''
+    Out-of-core tree DP for trees larger than RAM, over a depth-sorted parent record file
+    (deepest vertices first). DatasetLoader.write_depth_sorted writes one from a CSRTree
+    and so needs the whole tree in memory; write_depth_sorted_external writes one from a
+    parent array file in chunks, for trees that do not fit.
+
+    Records are read in fixed-size chunks into one reusable buffer. The DP state is two int32
+    arrays in a memory-mapped temporary file, indexed by record position:
+    acc0[i] : sum of dp1 over the children of record i (its final dp0)
+    accm[i] : sum of min(dp0, dp1) over the children of record i (its final dp1 is 1 + accm[i])
+    Children come before their parent, so when a record is read its state is final and it is
+    added into its parent's state. Children of a chunk map to a contiguous run of parent
+    records in the next level, so a chunk touches about as many state pages as it has records.
+    After every chunk the mapped state pages are dropped from the process (MADV_DONTNEED,
+    the data stays in the page cache and the file), which keeps peak RSS near budget_mb
+    whatever the number of vertices.
+
+    Within a chunk, a run of records whose parents all lie beyond the run is one numpy step
+    (ufunc.at). After a run shorter than MIN_RUN (deep, path-like parts) the next WINDOW
+    records are done one by one before trying numpy again.
+
+    After solve, chunks is the number of chunks read and mb_per_s the record throughput.
+    '''
+
+    # bytes of memory per record of a chunk: the record, its and its parent's state and
+    # the numpy temporaries of one step
+    RECORD_COST = 64
+
+    MIN_RUN = 64
+    WINDOW = 4096
+
+    def __init__(self, budget_mb: float = 64, state_dir: str = None):
+        self.budget_mb = budget_mb
+        self.state_dir = state_dir
+        self.chunks = 0
+        self.mb_per_s = None
+
+    def solve(self, filename: str, profiler: Profiler = None) -> tuple[int, int]:
+        '''
+        returns minimum vertex cover size (sum over the trees of the file) and peak memory
+        usage in MB (None without a profiler, only phases are timed then), unit weights
+        '''
+        loader = DatasetLoader()
+        path = loader.resolve(filename)
+        header = loader.read_header(path)
+        if header is None or header['kind'] != KIND_DEPTH:
+            raise ValueError(f'{path} is not a depth-sorted record file')
+
+        N = int(header['N'])
+        chunk = max(self.MIN_RUN, int(self.budget_mb * 1024 ** 2) // self.RECORD_COST)
+
+        with Profiler.session(profiler) as profiler:
+            start_time = time.perf_counter()
+            self.chunks = 0
+            vc = 0
+
+            with tempfile.TemporaryFile(dir=self.state_dir) as state, open(path, 'rb') as f:
+                with profiler.phase('build'):
+                    # a fresh file reads as zeros, nothing to initialize
+                    state.truncate(max(1, 2 * N * 4))
+                    mm = mmap.mmap(state.fileno(), 0)
+                    acc0 = np.frombuffer(mm, dtype=np.int32, count=N)
+                    accm = np.frombuffer(mm, dtype=np.int32, count=N, offset=N * 4)
+
+                buf = np.empty(min(chunk, N), dtype=DEPTH_RECORD)
+                f.seek(HEADER.itemsize)
+
+                with profiler.phase('solve'):
+                    for start in range(0, N, chunk):
+                        records = buf[:min(chunk, N - start)]
+                        if f.readinto(records) != records.nbytes:
+                            raise ValueError(f'{path} is truncated')
+
+                        vc += self.accumulate(acc0, accm, records['parent'].copy(), start)
+                        self.chunks += 1
+
+                        drop_pages(mm)
+
+                # views into the map have to be gone before it closes
+                del acc0, accm
+                mm.close()
+
+            elapsed = time.perf_counter() - start_time
+            self.mb_per_s = os.path.getsize(path) / (1024 ** 2) / elapsed if elapsed > 0 else float('inf')
+
+            mem_usage = profiler.peak_mb()
+
+        return vc, mem_usage
+
+    def accumulate(self, acc0: np.ndarray, accm: np.ndarray, parent: np.ndarray, start: int) -> int:
+        '''
+        adds the records start..start + len(parent) - 1 into their parents,
+        returns the cover sizes of the roots among them
+        '''
+        count = parent.size
+        index = np.arange(start, start + count)
+        has = parent >= 0
+        if np.any(parent[has] <= index[has]) or np.any(parent >= acc0.size):
+            raise ValueError('records are not sorted deepest first')
+
+        # first parent at or after every record, records s..e - 1 are final if e is at most that
+        limit = np.where(has, parent, acc0.size)
+        first = np.minimum.accumulate(limit[::-1])[::-1] - start
+
+        total = 0
+        s = 0
+        while s < count:
+            e = min(count, int(first[s]))
+            if e - s < self.MIN_RUN:
+                e = min(count, s + self.WINDOW)
+                total += self.accumulate_sequential(acc0, accm, parent[s:e], start + s)
+                s = e
+                continue
+
+            exc = acc0[start + s:start + e]
+            inc = accm[start + s:start + e] + 1
+            best = np.minimum(exc, inc)
+            par, child = parent[s:e], has[s:e]
+
+            total += int(best[~child].sum())
+            np.add.at(acc0, par[child], inc[child])
+            np.add.at(accm, par[child], best[child])
+            s = e
+
+        return total
+
+    def accumulate_sequential(self, acc0: np.ndarray, accm: np.ndarray, parent: np.ndarray, start: int) -> int:
+        '''
+        accumulate one record at a time
+        '''
+        a0, am = memoryview(acc0), memoryview(accm)
+        total = 0
+
+        for i, p in enumerate(parent.tolist(), start):
+            exc, inc = a0[i], am[i] + 1
+            best = inc if inc < exc else exc
+            if p < 0:
+                total += best
+            else:
+                a0[p] += inc
+                am[p] += best
+
+        return total
@@ -0,0 +1,333 @@
+import time
+import random
+
+import numpy as np
+
+from utils.csr import CSRTree
+from utils.profiler import Profiler
+
+
+class LocalSearch:
+    '''
+    Time-budgeted local search for minimum vertex cover of general graphs (NuMVC/FastVC style),
+    finds good covers of graphs far too large for branch and bound but proves nothing
+    unless the cover meets the matching lower bound
+
+    The graph is held as flat arrays: edges eu[e], ev[e] and for every vertex its incident
+    (neighbor, edge) pairs in CSR layout (nbr[off[v]:off[v + 1]], inc[off[v]:off[v + 1]]).
+
+    1) Initial cover (FastVC): scan the edges, an uncovered edge takes its end of higher
+       degree, then vertices whose edges are all covered twice are dropped again.
+    2) Whenever the cover C covers every edge it is recorded as the best, and a vertex
+       uncovering few edges is removed, looking for a cover of one vertex less.
+    3) Otherwise one step swaps a vertex out and in:
+       - remove u from C with the highest score, chosen best-from-multiple-selection (BMS):
+         best of `samples` random vertices of C, older vertices break ties
+       - add an end v of a random uncovered edge, v must have changed its configuration
+         (a neighbor was removed or added since v was removed, confChange of NuMVC),
+         the higher dscore wins, older vertices break ties
+       - every uncovered edge gains weight 1, so long uncovered edges attract the search
+    4) Forgetting: once the mean edge weight reaches gamma (default |V| / 2) all edge
+       weights shrink to rho times their value (at least 1).
+
+    score[v] is the change in the number of uncovered edges if v swaps in or out of C: minus
+    the edges only covered by v for v in C, its uncovered edges for v not in C. dscore[v] is the
+    same with edge weights. Removal goes by score (FastVC): weighted scores of BMS samples from
+    a large cover are mostly noise, and on sparse graphs of 10^5 vertices removing by dscore
+    let the uncovered edges pile up. The weights only decide which end of an edge comes in.
+
+    seed        : seed of the random number generator, with max_steps runs are reproducible
+    samples     : BMS sample size
+    gamma, rho  : forgetting threshold (mean edge weight) and factor
+    max_steps   : stop after this many swap steps (None for the time budget only)
+    check_interval : steps between reads of the clock for the deadline
+
+    After solve, steps is the number of swap steps, initial_size the size of the
+    initial cover and lower_bound the size of a maximal matching.
+    '''
+
+    def __init__(self, seed: int = None, samples: int = 50, gamma: float = None, rho: float = 0.3,
+                 max_steps: int = None, check_interval: int = 1024):
+        self.seed = seed
+        self.samples = samples
+        self.gamma = gamma
+        self.rho = rho
+        self.max_steps = max_steps
+        self.check_interval = check_interval
+        self.steps = 0
+        self.initial_size = None
+        self.lower_bound = None
+
+    def solve(self, G, T: float, profiler: Profiler = None, callback=None) -> tuple[set, list, bool, int]:
+        '''
+        returns (cover, times, cutoff, mem_usage) with the same times format as BranchAndBound,
+        tuple=(VC size, seconds since start) for every improved cover, cutoff is False only if the
+        cover is proven optimal (it has the size of a maximal matching), mem_usage is the peak
+        memory in MB (None without a profiler, only phases are timed then)
+
+        G is a networkx graph, a mapping from vertex to its neighbors or a CSRTree (vertices 1..N),
+        T the time budget in seconds. callback is called with an event dict for every improved
+        cover: size, time (seconds since start) and steps
+        '''
+        with Profiler.session(profiler) as profiler:
+            start_time = time.perf_counter()
+            deadline = start_time + T
+
+            with profiler.phase('build'):
+                labels, eu, ev = self.edges(G)
+                self.build(len(labels), eu, ev)
+
+            times = []
+
+            def report(size: int) -> None:
+                stamp = time.perf_counter() - start_time
+                times.append((size, stamp))
+                if callback:
+                    callback({'size': size, 'time': stamp, 'steps': self.steps})
+
+            with profiler.phase('initial'):
+                self.initial_cover()
+            self.initial_size = len(self.C)
+            report(self.initial_size)
+
+            with profiler.phase('search'):
+                best = self.search(deadline, report)
+
+            cover = {labels[v] for v in np.flatnonzero(np.frombuffer(best, dtype=np.uint8)).tolist()}
+            cutoff = len(cover) > self.lower_bound
+
+            mem_usage = profiler.peak_mb()
+
+        return cover, times, cutoff, mem_usage
+
+    def edges(self, G) -> tuple[list, np.ndarray, np.ndarray]:
+        '''
+        returns (labels, eu, ev): every edge once (eu < ev) over vertex indices 0..n-1,
+        labels[i] is the vertex of index i, self loops are dropped
+        '''
+        if isinstance(G, CSRTree):
+            labels = range(1, G.N + 1)
+            degree = np.diff(G.offsets[1:])
+            src = np.repeat(np.arange(G.N, dtype=np.int64), degree)
+            dst = G.neighbors.astype(np.int64) - 1
+        else:
+            labels = list(G)
+            index = {v: i for i, v in enumerate(labels)}
+            pairs = [(i, index[u]) for i, v in enumerate(labels) for u in G[v]]
+            pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+            src, dst = pairs[:, 0], pairs[:, 1]
+
+        # both directions of an edge collapse into one (u < v) pair
+        u, v = np.minimum(src, dst), np.maximum(src, dst)
+        keep = u != v
+        key = np.unique(u[keep] * len(labels) + v[keep])
+        return labels, key // len(labels), key % len(labels)
+
+    def build(self, n: int, eu: np.ndarray, ev: np.ndarray) -> None:
+        '''
+        incident edge arrays and the search state, every edge uncovered with weight 1
+        '''
+        m = eu.size
+        src = np.concatenate((eu, ev))
+        by_src = np.argsort(src, kind='stable')
+
+        off = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=off[1:])
+
+        # plain lists, the search reads them one element at a time
+        self.n, self.m = n, m
+        self.eu, self.ev = eu.tolist(), ev.tolist()
+        self.off = off.tolist()
+        self.nbr = np.concatenate((ev, eu))[by_src].tolist()
+        self.inc = (by_src % max(m, 1)).tolist()
+
+        self.w = [1] * m
+        self.score = np.diff(off).tolist()
+        self.dscore = list(self.score)
+        self.in_c = bytearray(n)
+        self.conf = bytearray(b'\x01') * n
+        self.age = [0] * n
+
+        # C and U with positions, for O(1) removal and uniform sampling
+        self.C, self.cpos = [], [-1] * n
+        self.U, self.upos = list(range(m)), list(range(m))
+
+    def add(self, v: int) -> None:
+        in_c, score, dscore, w, conf = self.in_c, self.score, self.dscore, self.w, self.conf
+        in_c[v] = 1
+        score[v] = -score[v]
+        dscore[v] = -dscore[v]
+        self.cpos[v] = len(self.C)
+        self.C.append(v)
+
+        nbr, inc = self.nbr, self.inc
+        for i in range(self.off[v], self.off[v + 1]):
+            u, e = nbr[i], inc[i]
+            conf[u] = 1
+            if in_c[u]:
+                # no longer covered by u alone
+                score[u] += 1
+                dscore[u] += w[e]
+            else:
+                self.cover_edge(e)
+                score[u] -= 1
+                dscore[u] -= w[e]
+
+    def remove(self, v: int) -> None:
+        in_c, score, dscore, w, conf = self.in_c, self.score, self.dscore, self.w, self.conf
+        in_c[v] = 0
+        score[v] = -score[v]
+        dscore[v] = -dscore[v]
+        conf[v] = 0
+
+        # the last vertex of C takes the place of v
+        C, cpos = self.C, self.cpos
+        last = C.pop()
+        if last != v:
+            C[cpos[v]] = last
+            cpos[last] = cpos[v]
+        cpos[v] = -1
+
+        nbr, inc = self.nbr, self.inc
+        for i in range(self.off[v], self.off[v + 1]):
+            u, e = nbr[i], inc[i]
+            conf[u] = 1
+            if in_c[u]:
+                # now covered by u alone
+                score[u] -= 1
+                dscore[u] -= w[e]
+            else:
+                self.upos[e] = len(self.U)
+                self.U.append(e)
+                score[u] += 1
+                dscore[u] += w[e]
+
+    def cover_edge(self, e: int) -> None:
+        U, upos = self.U, self.upos
+        last = U.pop()
+        if last != e:
+            U[upos[e]] = last
+            upos[last] = upos[e]
+        upos[e] = -1
+
+    def initial_cover(self) -> None:
+        '''
+        FastVC construction, also computes the maximal matching lower bound
+        '''
+        eu, ev, off, in_c = self.eu, self.ev, self.off, self.in_c
+        matched = bytearray(self.n)
+        matching = 0
+
+        for a, b in zip(eu, ev):
+            if not matched[a] and not matched[b]:
+                matched[a] = matched[b] = 1
+                matching += 1
+            if not in_c[a] and not in_c[b]:
+                self.add(a if off[a + 1] - off[a] >= off[b + 1] - off[b] else b)
+
+        # vertices whose edges are all covered twice (score 0) are redundant
+        score = self.score
+        for v in list(self.C):
+            if score[v] == 0:
+                self.remove(v)
+
+        self.lower_bound = matching
+        self.conf = bytearray(b'\x01') * self.n
+
+    def select_remove(self, rng: random.Random) -> int:
+        '''
+        best of samples random cover vertices: highest score, then oldest
+        '''
+        C, score, age = self.C, self.score, self.age
+        best = C[rng.randrange(len(C))]
+        for _ in range(self.samples - 1):
+            v = C[rng.randrange(len(C))]
+            if score[v] > score[best] or (score[v] == score[best] and age[v] < age[best]):
+                best = v
+        return best
+
+    def select_add(self, e: int) -> int:
+        dscore, age, conf = self.dscore, self.age, self.conf
+        a, b = self.eu[e], self.ev[e]
+        if not conf[a]:
+            return b
+        if not conf[b]:
+            return a
+        if dscore[a] != dscore[b]:
+            return a if dscore[a] > dscore[b] else b
+        return a if age[a] <= age[b] else b
+
+    def forget(self) -> None:
+        '''
+        scales all edge weights by rho and recomputes dscore
+        '''
+        w = self.w = [max(1, int(weight * self.rho)) for weight in self.w]
+        dscore = self.dscore = [0] * self.n
+        in_c = self.in_c
+        for a, b, weight in zip(self.eu, self.ev, w):
+            if in_c[a] and not in_c[b]:
+                dscore[a] -= weight
+            elif in_c[b] and not in_c[a]:
+                dscore[b] -= weight
+            elif not in_c[a]:
+                dscore[a] += weight
+                dscore[b] += weight
+        self.total_weight = sum(w)
+
+    def search(self, deadline: float, report) -> bytearray:
+        '''
+        swap steps until the deadline, max_steps or a cover of lower_bound size,
+        returns the in-cover flags of the best cover
+        '''
+        rng = random.Random(self.seed)
+        best = bytes(self.in_c)
+        best_size = len(self.C)
+
+        # mean edge weight threshold for forgetting
+        gamma = self.gamma if self.gamma is not None else self.n / 2
+        self.total_weight = self.m
+        limit = gamma * self.m
+
+        eu, ev, age = self.eu, self.ev, self.age
+        step = 0
+
+        while best_size > self.lower_bound:
+            if not self.U:
+                if len(self.C) < best_size:
+                    best = bytes(self.in_c)
+                    best_size = len(self.C)
+                    report(best_size)
+                    if best_size <= self.lower_bound:
+                        break
+
+                # look for a cover one vertex smaller
+                self.remove(self.select_remove(rng))
+                continue
+
+            u = self.select_remove(rng)
+            self.remove(u)
+            age[u] = step
+
+            U = self.U
+            v = self.select_add(U[rng.randrange(len(U))])
+            self.add(v)
+            age[v] = step
+
+            # edge weighting, dscore follows the weights of uncovered edges
+            U, w, dscore = self.U, self.w, self.dscore
+            for e in U:
+                w[e] += 1
+                dscore[eu[e]] += 1
+                dscore[ev[e]] += 1
+            self.total_weight += len(U)
+            if self.total_weight >= limit:
+                self.forget()
+
+            step += 1
+            self.steps = step
+            if step % self.check_interval == 0 and time.perf_counter() > deadline:
+                break
+            if self.max_steps is not None and step >= self.max_steps:
+                break
+
+        return best
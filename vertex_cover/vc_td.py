@@ -0,0 +1,227 @@
+import heapq
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from utils.profiler import Profiler
+
+
+class TreeDecompositionDP:
+    '''
+    Exact minimum vertex cover of general graphs by dynamic programming over a tree
+    decomposition, linear in N for bounded treewidth
+
+    The decomposition is an elimination ordering: eliminating v connects its remaining
+    neighbors into a clique, its bag is v plus those neighbors (bags[v]). The DP then
+    runs bucket elimination in that order. The table of a bag holds the cheapest cover
+    cost of everything eliminated below it for every 0/1 assignment of the bag, as a
+    numpy array of shape (2,) * len(bag) (a dense table indexed by the assignment
+    bitmask, axis 0 is v). Minimizing out v leaves a message over the remaining
+    neighbors, which is added to the bag of the first of them to be eliminated.
+
+    Heuristics:
+    min_degree : eliminate a vertex of least degree first
+    min_fill   : eliminate a vertex adding the fewest fill edges first (degree breaks ties,
+                 vertices of degree above FILL_DEGREE are scored by their worst case fill)
+
+    After solve, width is the decomposition width (largest bag - 1) and table_bytes the
+    peak memory of the live DP tables plus the stored choices.
+    '''
+
+    HEURISTICS = ('min_degree', 'min_fill')
+
+    # exact fill is only counted for vertices up to this degree, O(degree^2) each
+    FILL_DEGREE = 64
+
+    def __init__(self, max_width: int = 20):
+        self.max_width = max_width
+        self.labels = None
+        self.graph_adj = None
+        self.order = None
+        self.bags = None
+        self.choice = None
+        self.width = None
+        self.table_bytes = None
+        self.profiler = None
+
+    def solve(self, G, heuristic: str = 'min_degree', profiler: Profiler = None) -> tuple[int, int]:
+        '''
+        returns minimum vertex cover size and peak memory usage in MB (None without
+        a profiler, only phases are timed then), G is a networkx graph or mapping from vertex to its neighbors,
+        raises ValueError if the decomposition is wider than max_width
+        '''
+        if heuristic not in self.HEURISTICS:
+            raise ValueError(f'unknown heuristic: {heuristic}')
+
+        with Profiler.session(profiler) as profiler:
+            self.profiler = profiler
+
+            with profiler.phase('decompose'):
+                self.decompose(G, heuristic)
+
+            with profiler.phase('solve'):
+                vc = self.eliminate()
+
+            mem_usage = profiler.peak_mb()
+
+        return vc, mem_usage
+
+    def decompose(self, G, heuristic: str) -> None:
+        '''
+        greedy elimination ordering, fills order and bags (vertex indices 0..n-1)
+        '''
+        self.labels = list(G)
+        index = {v: i for i, v in enumerate(self.labels)}
+        n = len(self.labels)
+        adj = [{index[u] for u in G[v] if u != v} for v in self.labels]
+
+        # adj gets the fill edges, the DP needs the original ones
+        self.graph_adj = [set(neighbors) for neighbors in adj]
+
+        score = self.fill_score if heuristic == 'min_fill' else self.degree_score
+
+        # lazy heap, entries with an outdated score are skipped
+        current = [score(adj, v) for v in range(n)]
+        heap = [(s, v) for v, s in enumerate(current)]
+        heapq.heapify(heap)
+
+        eliminated = bytearray(n)
+        order, bags = [], [None] * n
+        width = 0
+
+        while heap:
+            s, v = heapq.heappop(heap)
+            if eliminated[v] or s != current[v]:
+                continue
+
+            bag = adj[v]
+            if len(bag) > self.max_width:
+                raise ValueError(f'tree decomposition wider than max_width ({self.max_width})')
+
+            eliminated[v] = 1
+            order.append(v)
+            bags[v] = tuple(bag)
+            width = max(width, len(bag))
+
+            # a fill edge between two neighbors of v also lowers the fill of every vertex
+            # adjacent to both of them, so those are scored again along with the bag
+            rescore = set(bag)
+            if heuristic == 'min_fill' and s[0] > 0:
+                shared = Counter(w for u in bag for w in adj[u] if w != v and w not in bag)
+                rescore.update(w for w, count in shared.items() if count > 1)
+
+            # neighbors of v become a clique
+            for u in bag:
+                adj[u].discard(v)
+                adj[u].update(w for w in bag if w != u)
+
+            for u in rescore:
+                current[u] = score(adj, u)
+                heapq.heappush(heap, (current[u], u))
+
+            adj[v] = None
+
+        self.order, self.bags, self.width = order, bags, width
+
+    def degree_score(self, adj: list[set], v: int) -> int:
+        return len(adj[v])
+
+    def fill_score(self, adj: list[set], v: int) -> tuple[int, int]:
+        neighbors = adj[v]
+        d = len(neighbors)
+        if d > self.FILL_DEGREE:
+            return d * (d - 1) // 2, d
+
+        # each missing edge among the neighbors is counted from both ends
+        missing = sum(len(neighbors - adj[u]) - 1 for u in neighbors)
+        return missing // 2, d
+
+    def eliminate(self) -> int:
+        '''
+        bucket elimination along order, returns the minimum cover size
+        '''
+        order, bags = self.order, self.bags
+        position = [0] * len(order)
+        for i, v in enumerate(order):
+            position[v] = i
+
+        # any cover costs at most n, so n + 1 marks an uncovered edge
+        INF = len(order) + 1
+
+        # messages waiting at the first vertex of their scope to be eliminated
+        pending = defaultdict(list)
+        self.choice = [None] * len(order)
+
+        total = 0
+        # bytes of pending messages and of stored choices
+        waiting = stored = peak = 0
+
+        for v in order:
+            scope = bags[v]
+            k = len(scope)
+
+            # axis 0 is v, axis i + 1 is scope[i]
+            table = np.zeros((2,) * (k + 1), dtype=np.int32)
+            table[1] += 1
+
+            # edges to later vertices must be covered by one of the ends
+            axis = {u: i + 1 for i, u in enumerate(scope)}
+            for u in scope:
+                if self.is_edge(v, u):
+                    at = [slice(None)] * (k + 1)
+                    at[0] = at[axis[u]] = 0
+                    table[tuple(at)] = INF
+
+            for message_scope, message in pending.pop(v, ()):
+                # v itself is axis 0
+                table += self.align(message, [axis.get(u, 0) for u in message_scope], k + 1)
+                np.minimum(table, INF, out=table)
+                waiting -= message.nbytes
+
+            message = table.min(axis=0)
+            self.choice[v] = table[1] < table[0]
+            stored += self.choice[v].nbytes
+            peak = max(peak, waiting + table.nbytes + message.nbytes + stored)
+
+            if k == 0:
+                total += int(message)
+            else:
+                first = min(scope, key=position.__getitem__)
+                pending[first].append((scope, message))
+                waiting += message.nbytes
+
+        self.table_bytes = peak
+        return total
+
+    def is_edge(self, v: int, u: int) -> bool:
+        '''
+        original edge between v and u (not a fill edge)
+        '''
+        return u in self.graph_adj[v]
+
+    def align(self, message: np.ndarray, axes: list[int], ndim: int) -> np.ndarray:
+        '''
+        view of message with its axes moved to positions axes of an ndim-dimensional bag table
+        '''
+        shape = [1] * ndim
+        for i in axes:
+            shape[i] = 2
+
+        by_position = sorted(range(len(axes)), key=axes.__getitem__)
+        if by_position != list(range(len(axes))):
+            message = message.transpose(by_position)
+        return message.reshape(shape)
+
+    def cover(self) -> set:
+        '''
+        vertices of a minimum cover of the last solve, traced back in reverse order
+        '''
+        if self.choice is None:
+            raise ValueError('cover reconstruction needs a solve first')
+
+        with self.profiler.phase('reconstruct'):
+            state = np.zeros(len(self.order), dtype=np.bool_)
+            for v in reversed(self.order):
+                state[v] = self.choice[v][tuple(int(state[u]) for u in self.bags[v])]
+
+            return {self.labels[v] for v in np.flatnonzero(state).tolist()}